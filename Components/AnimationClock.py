@@ -0,0 +1,42 @@
+from Constants import FPS
+
+"""
+  Shared clock of the looping animations. Every sprite playing the same looping animation shows the
+  same frame, so the frame is computed once per animation from the time elapsed, instead of each
+  sprite advancing its own frame index. Sprites read the frame of their animation from current.
+"""
+class AnimationClock():
+  def __init__(self):
+    # seconds elapsed since the clock started
+    self.elapsed = 0
+    # key -> (frames, frames shown per game frame at FPS) of each animation
+    self.animations = {}
+    # key -> surface currently shown by each animation
+    self.current = {}
+
+  """
+    Adds a looping animation, speed is in frames of the animation per game frame at FPS
+  """
+  def add(self, key, frames, speed):
+    self.animations[key] = (frames, speed)
+    self.current[key] = frames[self.frame_index(len(frames), speed)]
+
+  """
+    Returns the index of the frame shown for an animation of count frames
+  """
+  def frame_index(self, count, speed):
+    return int(self.elapsed * FPS * speed) % count
+
+  """
+    Advances the clock by dt seconds and updates the frame of every animation
+  """
+  def tick(self, dt):
+    self.elapsed += dt
+    for key, (frames, speed) in self.animations.items():
+      self.current[key] = frames[self.frame_index(len(frames), speed)]
+
+  """
+    Starts the clock over from the first frame of every animation
+  """
+  def reset(self):
+    self.tick(-self.elapsed)
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import struct
+import pygame as pg
+from .AssetManager import AssetManager
+
+"""
+  Cache of the processed images on disk. Slicing, colour keying and scaling the sprite sheets is
+  done once: the atlas pages and the built surfaces of the AssetManager are saved as raw pixels,
+  and the next runs read them back in one go with pg.image.frombuffer, without decoding any PNG.
+  The cache is only used while the sprite sheets it was made from are unchanged: same modification
+  time and size, or else the same sha1 of their contents, and while the code processing them is
+  the same (see processing_digest).
+
+  The metadata is JSON, never code: a cache file replaced by someone else can at worst be rejected.
+
+  File: header (magic, version, metadata length), JSON metadata (sources, pages, frames, surfaces)
+  followed by the pixels of every shelf of the atlas pages and of every surface.
+"""
+class AssetCache():
+  MAGIC = b'PAST'
+  VERSION = 3
+  HEADER = struct.Struct('<4sBI')
+  # modules whose code decides the pixels of the frames and surfaces: slicing, colour key, scale,
+  # packing and the platform blocks. Goal and Player only pass arguments, which are in the frame keys
+  PROCESSING_SOURCES = ('Spritesheet.py', 'AssetManager.py', 'TextureAtlas.py', 'Platform.py')
+  # sha1 of the processing sources, computed the first time it is needed
+  processing = None
+
+  """
+    Fills the AssetManager from the cache file, returns if the cache was used
+  """
+  def load(path):
+    # the images are already in memory, e.g. a second game in the same process
+    if AssetManager.frames:
+      return False
+    try:
+      with open(path, 'rb') as cache:
+        # a single read, the surfaces use the pixels where they are
+        data = bytearray(os.fstat(cache.fileno()).st_size)
+        cache.readinto(data)
+    except OSError:
+      return False
+    if len(data) < AssetCache.HEADER.size:
+      return False
+    magic, version, metadata_length = AssetCache.HEADER.unpack_from(data)
+    if magic != AssetCache.MAGIC or version != AssetCache.VERSION:
+      return False
+    start = AssetCache.HEADER.size
+    pixels = memoryview(data)[start + metadata_length:]
+    # everything is read before the AssetManager is touched, a broken cache leaves it empty
+    try:
+      metadata = json.loads(bytes(data[start:start + metadata_length]).decode('utf-8'))
+      if tuple(metadata['page_size']) != AssetManager.atlas.page_size or metadata['processing'] != AssetCache.processing_digest():
+        return False
+      if not AssetCache.is_valid(metadata['sources']):
+        return False
+      strips = [[AssetCache.read_surface(pixels, strip) for strip in page['strips']] for page in metadata['pages']]
+      frames = {}
+      for key, (page, shelf, x, width, height) in metadata['frames']:
+        frames[AssetCache.to_key(key)] = strips[page][shelf].subsurface(pg.Rect(x, 0, width, height))
+      surfaces = {AssetCache.to_key(name): AssetCache.read_surface(pixels, surface) for name, surface in metadata['surfaces']}
+    except (ValueError, KeyError, TypeError, IndexError, AttributeError, pg.error):
+      return False
+    for page, page_strips in zip(metadata['pages'], strips):
+      AssetManager.atlas.add_page(tuple(page['size']), page['shelves'], page_strips, page['frames'], page['used'])
+    AssetManager.frames.update(frames)
+    AssetManager.surfaces.update(surfaces)
+    AssetManager.changed = False
+    return True
+
+  """
+    Writes the images of the AssetManager to the cache file
+  """
+  def save(path):
+    pixels = []
+    offset = [0]
+    # adds the pixels of a surface, returns how to read them back
+    def write_surface(surface):
+      alpha = surface.get_flags() & pg.SRCALPHA
+      mode = 'BGRA' if alpha else 'RGB'
+      buffer = pg.image.tobytes(surface, mode)
+      pixels.append(buffer)
+      offset[0] += len(buffer)
+      return (mode, surface.get_size(), surface.get_colorkey(), offset[0] - len(buffer), len(buffer))
+    # strip of pixels -> (page, shelf)
+    shelf_index = {}
+    pages = []
+    for index, page in enumerate(AssetManager.atlas.pages):
+      for shelf, strip in enumerate(page.strips):
+        shelf_index[id(strip)] = (index, shelf)
+      pages.append({
+        'size': page.size,
+        'strips': [write_surface(strip) for strip in page.strips],
+        'shelves': page.shelves,
+        'frames': page.frames,
+        'used': page.used,
+      })
+    # keys are tuples, stored as [key, value] pairs since JSON objects only have string keys
+    frames = []
+    for key, frame in AssetManager.frames.items():
+      frames.append([key, shelf_index[id(frame.get_parent())] + (frame.get_offset()[0],) + frame.get_size()])
+    metadata = json.dumps({
+      'page_size': AssetManager.atlas.page_size,
+      'processing': AssetCache.processing_digest(),
+      'sources': {path: AssetCache.source_info(path) for path in {key[0] for key in AssetManager.frames}},
+      'pages': pages,
+      'frames': frames,
+      'surfaces': [[name, write_surface(surface)] for name, surface in AssetManager.surfaces.items()],
+    }).encode('utf-8')
+    directory = os.path.dirname(path)
+    if directory:
+      os.makedirs(directory, exist_ok=True)
+    # written next to it then renamed, so a game starting meanwhile never reads half a file
+    temporary = path + '.' + str(os.getpid())
+    with open(temporary, 'wb') as cache:
+      cache.write(AssetCache.HEADER.pack(AssetCache.MAGIC, AssetCache.VERSION, len(metadata)))
+      cache.write(metadata)
+      for buffer in pixels:
+        cache.write(buffer)
+    os.replace(temporary, path)
+    AssetManager.changed = False
+
+  """
+    Returns the key of a frame or surface read from JSON, the lists back to tuples
+  """
+  def to_key(value):
+    if isinstance(value, list):
+      return tuple(AssetCache.to_key(item) for item in value)
+    return value
+
+  """
+    Returns a surface from its pixels in the cache
+  """
+  def read_surface(pixels, surface_info):
+    mode, size, colorkey, offset, length = surface_info
+    if mode not in ('BGRA', 'RGB'):
+      raise ValueError('unknown pixel format ' + str(mode))
+    surface = pg.image.frombuffer(pixels[offset:offset + length], size, mode)
+    if mode == 'RGB':
+      surface = surface.convert()
+    elif surface.get_masks() != pg.Surface((1, 1), pg.SRCALPHA, 32).convert_alpha().get_masks():
+      # only copied when the display uses another pixel order
+      surface = surface.convert_alpha()
+    surface.set_colorkey(colorkey)
+    return surface
+
+  """
+    Returns the sha1 of the code processing the images, a cache made by other code is not used
+  """
+  def processing_digest():
+    if AssetCache.processing is None:
+      digest = hashlib.sha1()
+      directory = os.path.dirname(os.path.abspath(__file__))
+      for name in AssetCache.PROCESSING_SOURCES:
+        with open(os.path.join(directory, name), 'rb') as source:
+          digest.update(source.read())
+      AssetCache.processing = digest.hexdigest()
+    return AssetCache.processing
+
+  """
+    Returns (modification time, size, sha1) of a source image
+  """
+  def source_info(path):
+    stat = os.stat(path)
+    with open(path, 'rb') as source:
+      digest = hashlib.sha1(source.read()).hexdigest()
+    return (stat.st_mtime_ns, stat.st_size, digest)
+
+  """
+    Returns if the source images are the same as when the cache was saved
+  """
+  def is_valid(sources):
+    for path, (mtime, size, digest) in sources.items():
+      try:
+        stat = os.stat(path)
+      except OSError:
+        return False
+      if stat.st_size != size:
+        return False
+      if stat.st_mtime_ns != mtime:
+        # touched but maybe not changed, compare the contents
+        with open(path, 'rb') as source:
+          if hashlib.sha1(source.read()).hexdigest() != digest:
+            return False
+    return True
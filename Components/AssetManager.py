@@ -0,0 +1,108 @@
+import pygame as pg
+from .Spritesheet import Spritesheet
+from .TextureAtlas import TextureAtlas
+from Constants import ATLAS_PAGE_SIZE
+
+"""
+  Process-wide cache of the game's images. Every sprite sheet is loaded from disk once and every
+  frame sliced from it is shared by all the objects using it, so restarting the game or creating
+  a new player does not load nor slice anything again.
+  The frames are packed into a texture atlas: each frame is a subsurface of one of a few large pages.
+"""
+class AssetManager():
+  # static data members, shared by the whole game
+  sheets = {}     # path -> Spritesheet of the loaded image
+  frames = {}     # (path, width, height, scale, colour, col, row, flipped) -> frame surface
+  surfaces = {}   # name -> surface built from other frames (e.g. the platform blocks)
+  atlas = TextureAtlas((ATLAS_PAGE_SIZE, ATLAS_PAGE_SIZE))  # pages holding the pixels of the frames
+  changed = False # if frames or surfaces were made since the asset cache was loaded or saved
+
+  """
+    Returns the sprite sheet of an image, loading it only the first time
+  """
+  def load_sheet(path):
+    spritesheet = AssetManager.sheets.get(path)
+    if spritesheet is None:
+      spritesheet = Spritesheet(pg.image.load(path).convert_alpha())
+      AssetManager.sheets[path] = spritesheet
+    return spritesheet
+
+  """
+    Returns a single frame of a sprite sheet, slicing it and packing it in the atlas only the first time
+    flipped returns the frame mirrored along the X axis
+  """
+  def get_frame(path, width, height, scale, colour, col=0, row=0, flipped=False):
+    key = (path, width, height, scale, tuple(colour), col, row, flipped)
+    frame = AssetManager.frames.get(key)
+    if frame is None:
+      if flipped:
+        frame = Spritesheet.flip_images([AssetManager.get_frame(path, width, height, scale, colour, col, row)])[0]
+      else:
+        frame = AssetManager.load_sheet(path).get_image(width, height, scale, colour, col, row)
+      frame = AssetManager.atlas.add(frame)
+      AssetManager.frames[key] = frame
+      AssetManager.changed = True
+    return frame
+
+  """
+    Returns the first count frames of a row of a sprite sheet
+  """
+  def get_frames(path, width, height, scale, colour, count, row=0, flipped=False):
+    return [AssetManager.get_frame(path, width, height, scale, colour, col, row, flipped) for col in range(count)]
+
+  """
+    Returns a named surface, calling build() to make it only the first time.
+    The name is a str or a tuple of str, int and bool, so it can be written to the asset cache
+  """
+  def get_surface(name, build):
+    surface = AssetManager.surfaces.get(name)
+    if surface is None:
+      surface = build()
+      AssetManager.surfaces[name] = surface
+      AssetManager.changed = True
+    return surface
+
+  """
+    Loads and slices a list of animations ahead of time,
+    each item is a dict of the arguments of get_frames
+  """
+  def preload(animations):
+    for animation in animations:
+      AssetManager.get_frames(**animation)
+
+  """
+    Returns if a frame is already in memory
+  """
+  def is_loaded(path, width, height, scale, colour, col=0, row=0, flipped=False):
+    return (path, width, height, scale, tuple(colour), col, row, flipped) in AssetManager.frames
+
+  """
+    Returns the amount of bytes used by the pixels of the loaded images, per kind and in total
+    the frames share the pixels of the atlas pages, so the atlas is counted instead of them
+  """
+  def memory_usage():
+    def size_of(surfaces):
+      return sum(surface.get_width() * surface.get_height() * surface.get_bytesize() for surface in surfaces)
+    usage = {
+      'sheets': size_of(spritesheet.sheet for spritesheet in AssetManager.sheets.values()),
+      'atlas': AssetManager.atlas.memory_usage(),
+      'surfaces': size_of(AssetManager.surfaces.values()),
+    }
+    usage['total'] = sum(usage.values())
+    return usage
+
+  """
+    Returns the pages of the atlas, how full they are and their memory
+  """
+  def atlas_report():
+    return AssetManager.atlas.report()
+
+  """
+    Forgets every loaded image, they will be loaded from disk again when needed
+  """
+  def clear():
+    AssetManager.sheets.clear()
+    AssetManager.frames.clear()
+    AssetManager.surfaces.clear()
+    AssetManager.atlas.clear()
+    AssetManager.changed = False
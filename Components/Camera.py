@@ -0,0 +1,46 @@
+"""
+  Camera of the scrolling mode: the views of the world are placed side by side and the camera follows
+  the player, showing the part of the world around it. The world is split in chunks as wide as the
+  screen (one per view), so at most two chunks are visible whatever the length of the world.
+"""
+class Camera():
+  def __init__(self, screen_size, chunk_width, chunks):
+    # size of the part of the world shown
+    self.width, self.height = screen_size
+    # width of a chunk (a view) in pixels, and how many there are
+    self.chunk_width = chunk_width
+    self.chunks = chunks
+    # width of the whole world
+    self.world_width = chunk_width * chunks
+    # left of the part of the world shown
+    self.x = 0
+
+  """
+    Centers the camera on a rect (in world coordinates), without showing past the ends of the world
+  """
+  def follow(self, rect):
+    self.x = max(0, min(rect.centerx - self.width // 2, self.world_width - self.width))
+
+  """
+    Returns the chunk holding an x coordinate, clipped to the world
+  """
+  def chunk_at(self, x):
+    return max(0, min(x // self.chunk_width, self.chunks - 1))
+
+  """
+    Returns the chunks seen by the camera
+  """
+  def visible_chunks(self):
+    return range(self.chunk_at(self.x), self.chunk_at(self.x + self.width - 1) + 1)
+
+  """
+    Returns where a chunk is drawn on the screen
+  """
+  def chunk_position(self, chunk):
+    return (chunk * self.chunk_width - self.x, 0)
+
+  """
+    Returns how much things in world coordinates are moved to be drawn on the screen
+  """
+  def offset(self):
+    return (-self.x, 0)
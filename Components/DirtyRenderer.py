@@ -0,0 +1,62 @@
+import pygame as pg
+
+"""
+  Renderer that only repaints the parts of the screen that changed since the last frame.
+  Each drawable is given as (key, token, surface, rect), where key identifies the drawable between
+  frames and token identifies what it looks like (its surface, or its text). A drawable is repainted
+  when its token or its rect changes, the area it covered before is restored from the background,
+  and only those areas are sent to the display.
+"""
+class DirtyRenderer():
+  def __init__(self, screen):
+    self.screen = screen
+    # key -> (token, rect) of what was drawn on the last frame
+    self.previous = {}
+    # view drawn on the last frame
+    self.view = None
+    # if the next frame has to be drawn completely
+    self.full = True
+
+  """
+    Forces the next frame to be a full redraw (e.g. when the game restarts)
+  """
+  def invalidate(self):
+    self.full = True
+
+  """
+    Draws a frame, background is the surface the screen is restored from
+  """
+  def render(self, background, drawables, view):
+    current = {key: (token, pg.Rect(rect)) for key, token, _, rect in drawables}
+    # the whole screen changes when going to another view
+    if self.full or view != self.view:
+      self.screen.blit(background, (0, 0))
+      for _, _, surface, rect in drawables:
+        self.screen.blit(surface, rect)
+      pg.display.flip()
+    else:
+      dirty = []
+      # drawables that moved or changed, the old and new areas are repainted as one
+      for key, (token, rect) in current.items():
+        previous = self.previous.get(key)
+        if previous is None:
+          dirty.append(rect)
+        elif previous != (token, rect):
+          dirty.append(rect.union(previous[1]))
+      # drawables that are no longer shown
+      for key, (_, rect) in self.previous.items():
+        if key not in current:
+          dirty.append(rect)
+      for area in dirty:
+        # only paint inside the area, so the drawables partially inside it are not blended twice
+        self.screen.set_clip(area)
+        self.screen.blit(background, area, area)
+        for _, _, surface, rect in drawables:
+          if area.colliderect(rect):
+            self.screen.blit(surface, rect)
+      self.screen.set_clip(None)
+      if dirty:
+        pg.display.update(dirty)
+    self.previous = current
+    self.view = view
+    self.full = False
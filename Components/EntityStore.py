@@ -0,0 +1,143 @@
+from array import array
+import pygame as pg
+from .MapLoader import MapLoader
+from .Platform import Platform
+
+"""
+  The entities of a single view, kept in arrays instead of one sprite per tile. Every tile is a byte
+  of the grid (its Platforms value, TILE_GOAL or TILE_EMPTY) and the position of a platform is given
+  by its row and column, so a platform costs a few bytes instead of a whole sprite. Goals still are
+  sprites, since they animate and are collected, but there are only a few of them.
+  The grid doubles as the spatial index of the view: the player only looks at the cells around it.
+  For collisions the platforms are merged into a few large rectangles (see MapLoader.merge_platforms),
+  the tiles are only drawn.
+"""
+class EntityStore():
+  def __init__(self, rows, cols, tile_size=64, origin=(0, 0)):
+    self.rows = rows
+    self.cols = cols
+    # size of the tiles and cells of the grid
+    self.tile_size = tile_size
+    # top left of the view, not (0, 0) when the view is placed in the world (scrolling camera)
+    self.origin = origin
+    # what is on each tile, row by row
+    self.tiles = bytearray([MapLoader.TILE_EMPTY]) * (rows * cols)
+    # index in tiles of every platform, in the order they were added
+    self.platform_tiles = array('I')
+    # index in tiles -> Goal of the goals, in the order they were added
+    self.goals = {}
+    # Platform handles of the merged platforms, the player collides with them
+    self.colliders = []
+
+  """
+    Places a platform of the given Platforms type on a tile
+  """
+  def add_platform(self, row, col, platform_type):
+    index = row * self.cols + col
+    self.tiles[index] = platform_type.value
+    self.platform_tiles.append(index)
+
+  """
+    Places a goal on a tile
+  """
+  def add_goal(self, row, col, goal):
+    index = row * self.cols + col
+    self.tiles[index] = MapLoader.TILE_GOAL
+    self.goals[index] = goal
+
+  """
+    Adds the rectangles the platforms are merged into, as (col, row, width, height) in tiles.
+    A merged platform has the type of its top left tile
+  """
+  def add_colliders(self, rectangles):
+    size = self.tile_size
+    origin_x, origin_y = self.origin
+    for col, row, width, height in rectangles:
+      rect = pg.Rect(origin_x + col * size, origin_y + row * size, width * size, height * size)
+      self.colliders.append(Platform(rect, self.tiles[row * self.cols + col]))
+
+  """
+    Returns (type value, x, y) of the top left of every platform, in the order they were added
+  """
+  def platforms(self):
+    size = self.tile_size
+    origin_x, origin_y = self.origin
+    cols = self.cols
+    tiles = self.tiles
+    return [(tiles[index], origin_x + index % cols * size, origin_y + index // cols * size) for index in self.platform_tiles]
+
+  """
+    Returns the description of the platforms of the view, used to know if it has to be drawn again
+  """
+  def signature(self):
+    return (self.origin, bytes(self.tiles).replace(bytes([MapLoader.TILE_GOAL]), bytes([MapLoader.TILE_EMPTY])))
+
+  """
+    Returns the first and last rows and columns of the cells the rectangle overlaps,
+    grown by margin cells on each side and clipped to the grid
+  """
+  def cells(self, rect, margin=0):
+    size = self.tile_size
+    origin_x, origin_y = self.origin
+    # right and bottom are exclusive, hence the - 1
+    first_col = max((rect.left - origin_x) // size - margin, 0)
+    last_col = min((rect.right - 1 - origin_x) // size + margin, self.cols - 1)
+    first_row = max((rect.top - origin_y) // size - margin, 0)
+    last_row = min((rect.bottom - 1 - origin_y) // size + margin, self.rows - 1)
+    return first_row, last_row, first_col, last_col
+
+  """
+    Returns the goals near the rectangle, row by row like the tiles of the map, followed by the
+    merged platforms near it (Platform handles).
+    The rectangle is grown by one cell on each side by default, since resolving a collision can
+    push the player up to one block away from where the query was made.
+  """
+  def query(self, rect, margin=1):
+    first_row, last_row, first_col, last_col = self.cells(rect, margin)
+    found = []
+    tiles = self.tiles
+    goals = self.goals
+    for row in range(first_row, last_row + 1):
+      start = row * self.cols
+      for col in range(first_col, last_col + 1):
+        if tiles[start + col] == MapLoader.TILE_GOAL:
+          found.append(goals[start + col])
+    near = rect.inflate(2 * margin * self.tile_size, 2 * margin * self.tile_size)
+    found.extend(platform for platform in self.colliders if near.colliderect(platform.rect))
+    return found
+
+  """
+    Returns the amount of bytes used by the arrays of the store, not counting the goals
+  """
+  def memory_usage(self):
+    return len(self.tiles) + self.platform_tiles.itemsize * len(self.platform_tiles)
+
+"""
+  Spatial index of the whole world used with the scrolling camera. The entities stay in the store
+  of their view, a query only looks at the views (chunks) the rectangle is near to, so it costs
+  the same no matter how long the world is. Views not in memory are built when they are queried.
+"""
+class ChunkIndex():
+  def __init__(self, streamer, chunk_width, cell_size=64):
+    # WorldStreamer holding the views
+    self.streamer = streamer
+    # width of a view in pixels
+    self.chunk_width = chunk_width
+    self.cell_size = cell_size
+
+  """
+    Returns the views within margin cells of the rectangle
+  """
+  def chunks(self, rect, margin=1):
+    first = max((rect.left - margin * self.cell_size) // self.chunk_width, 0)
+    last = min((rect.right - 1 + margin * self.cell_size) // self.chunk_width, len(self.streamer) - 1)
+    return range(first, last + 1)
+
+  """
+    Returns the goals and platforms near the rectangle, view by view
+  """
+  def query(self, rect, margin=1):
+    found = []
+    for chunk in self.chunks(rect, margin):
+      found.extend(self.streamer.get(chunk).index.query(rect, margin))
+    return found
@@ -0,0 +1,73 @@
+import pygame as pg
+
+"""
+  Decides when the main loop draws and how fast it ticks. A frame is only drawn when something
+  visible changed: the surfaces and places of everything in the render pipeline are compared with
+  the last frame drawn. On the end screens (game over, game finished) and while the window is not
+  focused the loop ticks at idle_fps, so idle games do not use the CPU for nothing.
+  busy_loop waits with Clock.tick_busy_loop, more precise but using a core while waiting.
+"""
+class FramePacer():
+  def __init__(self, idle_fps=10, busy_loop=False):
+    # frames per second when idle
+    self.idle_fps = idle_fps
+    # use tick_busy_loop instead of tick
+    self.busy_loop = busy_loop
+    # is the window focused
+    self.focused = True
+    # draw the next frame whatever happens, e.g. when the window has to be drawn again
+    self.force = True
+    # (surface, rect) of everything drawn on the last frame drawn
+    self.last_frame = None
+    # frames drawn and skipped
+    self.drawn = 0
+    self.skipped = 0
+
+  """
+    Follows the focus of the window and when it has to be drawn again, called with every event
+  """
+  def handle_event(self, event):
+    if event.type == pg.WINDOWFOCUSLOST:
+      self.focused = False
+    elif event.type == pg.WINDOWFOCUSGAINED:
+      self.focused = True
+      self.force = True
+    elif event.type in (pg.WINDOWEXPOSED, pg.VIDEOEXPOSE, pg.WINDOWRESTORED, pg.WINDOWSIZECHANGED):
+      self.force = True
+
+  """
+    Returns if the frame has to be drawn, that is if it would not look the same as the last one drawn
+  """
+  def should_draw(self, state):
+    frame = [(surface, tuple(rect)) for layer in state.pipeline.layers for surface, rect in layer.sequence()]
+    # texts about to change and the profiler graph are not in the pipeline yet
+    if self.force or state.hud_changed or state.profiler_overlay or frame != self.last_frame:
+      self.last_frame = frame
+      self.force = False
+      self.drawn += 1
+      return True
+    self.skipped += 1
+    return False
+
+  """
+    Returns if the game is idle: on an end screen or in a window that is not focused
+  """
+  def is_idle(self, state):
+    return not self.focused or state.completed or state.player_dead
+
+  """
+    Waits for the next frame, at fps or at idle_fps when idle (fps of 0 does not wait unless idle).
+    Returns the time since the last frame in seconds
+  """
+  def tick(self, clock, fps, state):
+    if self.is_idle(state):
+      fps = min(fps, self.idle_fps) if fps else self.idle_fps
+    if self.busy_loop:
+      return clock.tick_busy_loop(fps) / 1000
+    return clock.tick(fps) / 1000
+
+  """
+    Draws the next frame whatever happens, e.g. after the game was restored
+  """
+  def invalidate(self):
+    self.force = True
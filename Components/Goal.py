@@ -1,5 +1,6 @@
 import pygame as pg
-from Components.Spritesheet import Spritesheet
+from Components.AssetManager import AssetManager
+from Constants import FPS
 from Enums import Goals
 """
 	Class Goal is the items to collect per "view"
@@ -8,23 +9,24 @@ class Goal(pg.sprite.Sprite):
 	# static data members
 	surface_types = {} 			# contains the sprites details of a goal type, 
 	collected_surfaces = []	# contains the animation for the collected animation
-	def __init__(self, xpos, ypos, type):
+	# frames of the idle animation shown per game frame
+	ANIMATION_SPEED = 0.2
+	def __init__(self, xpos, ypos, type, clock):
 		super().__init__()
-		# assign the surface type based on the enum passed
-		self.surf = Goal.surface_types[type]['image'][0]
-		# assign the rect based on the surf
-		self.rect = self.surf.get_rect()
+		# assign the rect based on the surfaces of the type passed
+		self.rect = Goal.surface_types[type]['image'][0].get_rect()
 		# place position of goal in screen, based on passed parameters
 		self.rect.center = (xpos, ypos)
-		# define collision rectangle for this object
-		self.collideRect = pg.Rect((0, 0), (32, 32))
-		self.collideRect.center = self.rect.center
 		# type of goal
 		self.goal_type = type
-		# current frame of the animation
+		# AnimationClock playing the idle animation of every goal of this type, goals don't animate on their own
+		self.clock = clock
+		# current frame of the collected animation
 		self.frame_index = 0
 		# animation speed for this object
-		self.animation_speed = 0.2
+		self.animation_speed = Goal.ANIMATION_SPEED
+		# surface of the collected animation shown
+		self.collected_surf = Goal.collected_surfaces[0] if Goal.collected_surfaces else None
 		# tells if the object is collected
 		self.collected = False
 		# if object is ready for removal
@@ -38,15 +40,8 @@ class Goal(pg.sprite.Sprite):
 		collected_frames = 5
 		collected_path = 'Assets/Goals/'
 		collected_name = 'Collected.png'
-		# build path for the animation, and load the spritesheet
-		image = pg.image.load(collected_path + collected_name)
-		# instantiate the spritesheet object for easy access of per frame surface
-		spritesheet = Spritesheet(image)
-		# for each frame in the sprite sheet image
-		for frame in range(collected_frames):
-			# get nth frame of the image
-			collected_frame = spritesheet.get_image(ASSET_SIZE, ASSET_SIZE, 2, (0, 0, 0), frame)
-			Goal.collected_surfaces.append(collected_frame)
+		# get the frames of the animation, loaded from disk only once
+		Goal.collected_surfaces = AssetManager.get_frames(collected_path + collected_name, ASSET_SIZE, ASSET_SIZE, 2, (0, 0, 0), collected_frames)
 		
 	"""
 		A static method that initializes the surfaces needed for the goal. (Basically, the fruit shown in the view)
@@ -60,64 +55,63 @@ class Goal(pg.sprite.Sprite):
 				'frames': 17,
 				'path': "Cherries.png",
 				'image': [],
-				'spritesheet': None
 			},
 			Goals.KIWI: {
 				'frames': 17,
 				'path': "Kiwi.png",
 				'image': [],
-				'spritesheet': None
 			},
 			Goals.MELON: {
 				'frames': 17,
 				'path': "Melon.png",
 				'image': [],
-				'spritesheet': None
 			},
 		}
 		# for each dictionary key in surface_types
 		for surface_type in Goal.surface_types:
 			# define currently selected value with the key
 			type_props = Goal.surface_types[surface_type]
-			# load the image
-			image = pg.image.load(goal_path + type_props['path']).convert_alpha()
-			# make the image into a spritesheet class
-			spritesheet = Spritesheet(image)
-			# assign spritesheet to spritesheet value
-			type_props['spritesheet'] = spritesheet
-			# iterate for the amount of frames in the spritesheet
-			for frame in range(type_props['frames']):
-				# get the specific frame in the spritesheet
-				type_props['image'].append(spritesheet.get_image(ASSET_SIZE, ASSET_SIZE, 2, (0, 0, 0), frame))
+			path = goal_path + type_props['path']
+			# get the frames in the spritesheet
+			type_props['image'] = AssetManager.get_frames(path, ASSET_SIZE, ASSET_SIZE, 2, (0, 0, 0), type_props['frames'])
+
+	"""
+		A static method that adds the idle animation of every goal type to a clock
+	"""
+	def add_animations(clock):
+		for goal_type, type_props in Goal.surface_types.items():
+			clock.add(goal_type, type_props['image'], Goal.ANIMATION_SPEED)
+
+	# collision rectangle for this object, the 32x32 center of the goal, made when needed instead of kept per goal
+	@property
+	def collideRect(self):
+		collide_rect = pg.Rect((0, 0), (32, 32))
+		collide_rect.center = self.rect.center
+		return collide_rect
+
+	# the surface drawn: the collected animation once collected, else the frame of its type shown by the clock
+	@property
+	def surf(self):
+		if self.collected:
+			return self.collected_surf
+		return self.clock.current[self.goal_type]
 
 	# Sets this object to collected and prepares for collected animation
 	def collect(self):
+		# the collected animation is loaded after the first frame, unless a goal is collected before
+		if not Goal.collected_surfaces:
+			Goal.init_collected_animation()
 		self.collected = True
 		self.frame_index = 0
-	# Called when main loop is updating
-	def update(self):
-		self.animate()
-	# Update animations for this object
-	def animate(self):
-		# if this object is collected
-		if self.collected:
-			# use collected animation
-			animations = Goal.collected_surfaces
-			# increase frame index based on animation speed (animation speed is float)
-			self.frame_index += self.animation_speed
-			# if index is not going to overflow
-			if (self.frame_index < 5):
-				# update surface
-				self.surf = animations[int(self.frame_index)]
-			else:
-				# prepare object to be not shown on the map
-				self.end = True
+		self.collected_surf = Goal.collected_surfaces[0]
+	# Called while the collected animation plays, dt is the time elapsed in seconds
+	def update(self, dt):
+		# increase frame index based on animation speed (animation speed is float)
+		self.frame_index += self.animation_speed * FPS * dt
+		# if index is not going to overflow
+		if (self.frame_index < len(Goal.collected_surfaces)):
+			# update surface
+			self.collected_surf = Goal.collected_surfaces[int(self.frame_index)]
 		else:
-			# if not collected, repeat animations per frame
-			animations = Goal.surface_types[self.goal_type]['image']
-			self.frame_index += self.animation_speed
-			if (self.frame_index >= 17):
-				self.frame_index = 0
-			else:
-				self.surf = animations[int(self.frame_index)]
-		
\ No newline at end of file
+			# prepare object to be not shown on the map
+			self.end = True
@@ -0,0 +1,104 @@
+import pygame as pg
+
+"""
+  Maps the keys to named actions (left, right, jump, restart) and tells, for each frame, which
+  actions are held, which were just pressed and which were just released. The keys are followed
+  with the KEYDOWN and KEYUP events of the pg.event queue, so an action that has to run once per
+  press (e.g. restart) can use was_pressed instead of running on every frame the key is held.
+  The keys of an action can be changed with bind.
+"""
+class InputActions():
+  # action -> keys that trigger it
+  DEFAULT_BINDINGS = {
+    "left": [pg.K_a],
+    "right": [pg.K_d],
+    "jump": [pg.K_SPACE],
+    "restart": [pg.K_r],
+  }
+
+  def __init__(self, bindings=None):
+    # action -> keys that trigger it
+    self.bindings = {}
+    # key -> actions it triggers
+    self.actions_of_key = {}
+    for action, keys in (bindings or InputActions.DEFAULT_BINDINGS).items():
+      self.bind(action, keys)
+    # keys down, from the events
+    self.keys_down = set()
+    # actions held on this frame, and pressed or released since the last frame
+    self.held = set()
+    self.pressed = set()
+    self.released = set()
+    # actions pressed or released by the events of this frame, kept even if the key went back up
+    self.event_pressed = set()
+    self.event_released = set()
+
+  """
+    Sets the keys of an action, replacing its previous keys. Keys are pygame key codes or key names (e.g. "w")
+  """
+  def bind(self, action, keys):
+    self.bindings[action] = [pg.key.key_code(key) if isinstance(key, str) else key for key in keys]
+    self.actions_of_key = {}
+    for bound_action, bound_keys in self.bindings.items():
+      for key in bound_keys:
+        self.actions_of_key.setdefault(key, []).append(bound_action)
+
+  """
+    Follows the keys going down and up, called with every event of the frame
+  """
+  def handle_event(self, event):
+    if event.type == pg.KEYDOWN:
+      # a key already down is a repeat, not a new press
+      if event.key not in self.keys_down:
+        self.keys_down.add(event.key)
+        self.event_pressed.update(self.actions_of_key.get(event.key, ()))
+    elif event.type == pg.KEYUP:
+      if event.key in self.keys_down:
+        self.keys_down.discard(event.key)
+        self.event_released.update(self.actions_of_key.get(event.key, ()))
+    elif event.type == pg.WINDOWFOCUSLOST:
+      # the key up events are not received while the window is not focused
+      self.keys_down.clear()
+
+  """
+    Works out the actions of the frame, called after the events of the frame were handled.
+    keys (e.g. ScriptedKeys) replaces the keys down from the events when given
+  """
+  def update(self, keys=None):
+    if keys is None:
+      keys_down = self.keys_down
+      held = {action for action, bound in self.bindings.items() if any(key in keys_down for key in bound)}
+    else:
+      held = {action for action, bound in self.bindings.items() if any(keys[key] for key in bound)}
+    self.pressed = (held - self.held) | self.event_pressed
+    self.released = (self.held - held) | self.event_released
+    self.held = held
+    self.event_pressed = set()
+    self.event_released = set()
+
+  def is_held(self, action):
+    return action in self.held
+
+  def was_pressed(self, action):
+    return action in self.pressed
+
+  def was_released(self, action):
+    return action in self.released
+
+  """
+    Presses an action on the next update as if its key went down, even if the keys held do not
+    change, e.g. a tap of a key in a replay
+  """
+  def press(self, action):
+    self.event_pressed.add(action)
+
+  """
+    Forgets the keys down, e.g. when starting to replay scripted keys
+  """
+  def reset(self):
+    self.keys_down.clear()
+    self.held = set()
+    self.pressed = set()
+    self.released = set()
+    self.event_pressed = set()
+    self.event_released = set()
@@ -0,0 +1,204 @@
+import mmap
+import os
+import re
+import struct
+
+"""
+  Tiles of a world, stored as one byte per tile, row by row, view after view.
+  Platforms use the value of their Platforms enum, goals and empty tiles use TILE_GOAL and TILE_EMPTY.
+  The platforms of each view are also merged into a few large rectangles (see MapLoader.merge_platforms),
+  the player collides with them instead of with every tile.
+"""
+class TileMap():
+  def __init__(self, views, rows, cols, tiles, colliders=None):
+    # number of views in the world
+    self.views = views
+    # number of rows and columns of tiles per view
+    self.rows = rows
+    self.cols = cols
+    # the tiles of every view (bytes or a memory mapped file)
+    self.tiles = tiles
+    # (col, row, width, height) in tiles of the merged platforms, per view, read from the compiled world
+    # or merged the first time they are needed
+    self.colliders = colliders if colliders is not None else [None] * views
+    # the world as a single view, made the first time it is needed
+    self.concatenated_map = None
+
+  """
+    Returns (row, col, tile) of every tile of a view that is not empty, row by row
+  """
+  def view_tiles(self, view):
+    size = self.rows * self.cols
+    start = view * size
+    tiles = self.tiles[start:start + size]
+    # let the regex engine skip the empty tiles instead of looping through each of them
+    for match in MapLoader.NOT_EMPTY.finditer(tiles):
+      row, col = divmod(match.start(), self.cols)
+      yield row, col, tiles[match.start()]
+
+  """
+    Returns (col, row, width, height) in tiles of the rectangles the platforms of a view are merged into
+  """
+  def view_colliders(self, view):
+    if self.colliders[view] is None:
+      size = self.rows * self.cols
+      self.colliders[view] = MapLoader.merge_platforms(self.tiles[view * size:(view + 1) * size], self.rows, self.cols)
+    return self.colliders[view]
+
+  """
+    Returns the world as a single view, the views placed side by side from left to right
+  """
+  def concatenated(self):
+    if self.concatenated_map is not None:
+      return self.concatenated_map
+    size = self.rows * self.cols
+    tiles = b''.join(self.tiles[view * size + row * self.cols:view * size + (row + 1) * self.cols]
+                     for row in range(self.rows) for view in range(self.views))
+    self.concatenated_map = TileMap(1, self.rows, self.views * self.cols, tiles)
+    return self.concatenated_map
+
+"""
+  Loads and compiles the worlds of the game.
+  The text format (.dat) has the number of views on the first line, followed by the rows of each
+  view, one character per tile (a digit for a platform, G for a goal, X for nothing), and an empty
+  line after each view.
+  The compiled format (.map) is a header followed by the tiles of every view, one byte per tile,
+  then the merged platforms of every view: their count followed by (col, row, width, height) of each.
+"""
+class MapLoader():
+  # values of the goal and empty tiles, platforms use their enum value
+  TILE_GOAL = 0xFE
+  TILE_EMPTY = 0xFF
+  NOT_EMPTY = re.compile(b'[^\xff]')
+  # magic, version, views, rows, cols
+  HEADER = struct.Struct('<4sBHBB')
+  MAGIC = b'PLAT'
+  VERSION = 2
+  # number of merged platforms of a view, and (col, row, width, height) of one of them
+  COLLIDER_COUNT = struct.Struct('<H')
+  COLLIDER = struct.Struct('<4B')
+  # static data members, the worlds already loaded, path -> (modification time, TileMap)
+  maps = {}
+
+  """
+    Returns the tiles of a world, a .dat file is parsed and anything else is read as a compiled map.
+    The result is kept, so loading the same world again (e.g. on restart) does not read it again
+  """
+  def load(path):
+    mtime = os.stat(path).st_mtime_ns
+    cached = MapLoader.maps.get(path)
+    if cached is not None and cached[0] == mtime:
+      return cached[1]
+    if path.endswith('.dat'):
+      tile_map = MapLoader.parse_dat(path)
+    else:
+      tile_map = MapLoader.load_compiled(path)
+    MapLoader.maps[path] = (mtime, tile_map)
+    return tile_map
+
+  """
+    Parses a world in the text format
+  """
+  def parse_dat(path):
+    with open(path) as world_file:
+      lines = world_file.read().split('\n')
+    # read the first line to know how many "views" are in the screen
+    views_count = int(lines[0])
+    # views are separated by an empty line
+    views = []
+    rows = []
+    for line in lines[1:]:
+      if line == '':
+        if rows:
+          views.append(rows)
+          rows = []
+      else:
+        rows.append(line)
+    if rows:
+      views.append(rows)
+    views = views[:views_count]
+    # views with less rows or shorter lines are filled with empty tiles
+    rows_count = max(len(rows) for rows in views)
+    cols_count = max(len(line) for rows in views for line in rows)
+    tiles = bytearray([MapLoader.TILE_EMPTY]) * (views_count * rows_count * cols_count)
+    for view, rows in enumerate(views):
+      for row, line in enumerate(rows):
+        for col, entity in enumerate(line):
+          index = (view * rows_count + row) * cols_count + col
+          if entity == 'G':
+            tiles[index] = MapLoader.TILE_GOAL
+          elif entity != 'X':
+            tiles[index] = int(entity)
+    return TileMap(views_count, rows_count, cols_count, bytes(tiles))
+
+  """
+    Memory maps a compiled world, the tiles are read from the file as they are needed
+  """
+  def load_compiled(path):
+    with open(path, 'rb') as world_file:
+      # the mapping stays valid after the file is closed
+      tiles = mmap.mmap(world_file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, views, rows, cols = MapLoader.HEADER.unpack_from(tiles)
+    if magic != MapLoader.MAGIC or version != MapLoader.VERSION:
+      raise ValueError(path + ' is not a compiled world')
+    start = MapLoader.HEADER.size
+    end = start + views * rows * cols
+    if len(tiles) < end:
+      raise ValueError(path + ' is truncated')
+    colliders = []
+    try:
+      for view in range(views):
+        count, = MapLoader.COLLIDER_COUNT.unpack_from(tiles, end)
+        end += MapLoader.COLLIDER_COUNT.size
+        colliders.append(list(MapLoader.COLLIDER.iter_unpack(tiles[end:end + count * MapLoader.COLLIDER.size])))
+        end += count * MapLoader.COLLIDER.size
+    except struct.error:
+      raise ValueError(path + ' is truncated')
+    return TileMap(views, rows, cols, memoryview(tiles)[start:start + views * rows * cols], colliders)
+
+  """
+    Converts a world from the text format into the compiled format
+  """
+  def compile(source, destination):
+    tile_map = MapLoader.parse_dat(source)
+    MapLoader.save(tile_map, destination)
+    return tile_map
+
+  """
+    Writes the tiles of a world in the compiled format
+  """
+  def save(tile_map, destination):
+    with open(destination, 'wb') as world_file:
+      world_file.write(MapLoader.HEADER.pack(MapLoader.MAGIC, MapLoader.VERSION, tile_map.views, tile_map.rows, tile_map.cols))
+      world_file.write(tile_map.tiles)
+      for view in range(tile_map.views):
+        colliders = tile_map.view_colliders(view)
+        world_file.write(MapLoader.COLLIDER_COUNT.pack(len(colliders)))
+        for collider in colliders:
+          world_file.write(MapLoader.COLLIDER.pack(*collider))
+
+  """
+    Merges the platforms of a view into rectangles, greedily: from the first platform not merged yet
+    (row by row), the rectangle is grown to the right as far as the platforms go, then down as long
+    as the whole width is platforms. Every platform ends up in exactly one rectangle, so a strip of
+    ground is a single rectangle instead of one per tile, without seams between the tiles.
+    Returns (col, row, width, height) in tiles of every rectangle, in the order they were made
+  """
+  def merge_platforms(tiles, rows, cols):
+    # platforms not in a rectangle yet, goals and empty tiles are not solid
+    free = bytearray(1 if tile < MapLoader.TILE_GOAL else 0 for tile in tiles)
+    rectangles = []
+    for row in range(rows):
+      for col in range(cols):
+        if not free[row * cols + col]:
+          continue
+        width = 1
+        while col + width < cols and free[row * cols + col + width]:
+          width += 1
+        height = 1
+        while row + height < rows and all(free[(row + height) * cols + col:(row + height) * cols + col + width]):
+          height += 1
+        for merged_row in range(row, row + height):
+          free[merged_row * cols + col:merged_row * cols + col + width] = bytes(width)
+        rectangles.append((col, row, width, height))
+    return rectangles
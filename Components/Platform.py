@@ -1,34 +1,29 @@
 import pygame as pg
-from Components.Spritesheet import Spritesheet
+from Components.AssetManager import AssetManager
 from Enums import *
 
 """
   class of the platforms for the game. This builds a 64x64 block. 
+  The platforms of a view are kept in an EntityStore, a Platform is only a lightweight handle
+  to one of them (its rect and type), made when an object is needed, e.g. for collisions.
 """
-class Platform(pg.sprite.Sprite):
+class Platform():
   # static variables, shared with other platforms.
   surface_types = []
+  # no __dict__ per platform, only these two fields
+  __slots__ = ('rect', 'type')
 
-  def __init__(self, width, height, xpos, ypos, type: Platforms):
-    super().__init__()
-    # assign this object's surface based on the given type
-    self.surf = Platform.surface_types[int(type.value)]
-    # get the rectangle of the surface and assign it to self.refct
-    self.rect = self.surf.get_rect()
-    # place the block in the desired position from the parameter
-    self.rect.center = (xpos, ypos)
+  def __init__(self, rect, type):
+    # the 64x64 rectangle covered by the block
+    self.rect = rect
     # assign what type is the platform
-    self.type = type
+    self.type = Platforms(type)
+
+  # the surface of this platform, shared by every platform of the same type
+  @property
+  def surf(self):
+    return Platform.surface_types[self.type.value]
 
-    if (type == Platforms.BLOCK):
-      return (255, 0, 0)
-    elif (type == Platforms.GROUND):
-      return (255, 255, 0)
-  
-  # need to have update function so when entities are called on update
-  def update(self):
-    pass
-  
   # do not pass self since we want this to be a static function to be called
   def init_surfaces_per_type():
     CELL_SIZE = 16
@@ -36,16 +31,15 @@ class Platform(pg.sprite.Sprite):
     SCALED_PLAT_SIZE = PLATFORM_SIZE * 2
     platform_file = 'Terrain (16x16).png'
     platform_path = 'Assets/Platform/'
-    image = pg.image.load(platform_path + platform_file).convert_alpha()
-    platform_spritesheet = Spritesheet(image)
+    path = platform_path + platform_file
     # building blocks for each surface of the platforms, each block is a 16x16 image that is a part of the image,
     # since we're using a spritesheet we have to only get a part of the image that is relevant to the block
-    grass_left = platform_spritesheet.get_image(CELL_SIZE, CELL_SIZE, 1, (0, 0, 0), 6)
-    grass_center = platform_spritesheet.get_image(CELL_SIZE, CELL_SIZE, 1, (0, 0, 0), 7)
-    grass_right = platform_spritesheet.get_image(CELL_SIZE, CELL_SIZE, 1, (0, 0, 0), 8)
-    ground_left = platform_spritesheet.get_image(CELL_SIZE, CELL_SIZE, 1, (0, 0, 0), 6, 1)
-    ground_center = platform_spritesheet.get_image(CELL_SIZE, CELL_SIZE, 1, (0, 0, 0), 7, 1)
-    ground_right = platform_spritesheet.get_image(CELL_SIZE, CELL_SIZE, 1, (0, 0, 0), 8, 1)
+    grass_left = AssetManager.get_frame(path, CELL_SIZE, CELL_SIZE, 1, (0, 0, 0), 6)
+    grass_center = AssetManager.get_frame(path, CELL_SIZE, CELL_SIZE, 1, (0, 0, 0), 7)
+    grass_right = AssetManager.get_frame(path, CELL_SIZE, CELL_SIZE, 1, (0, 0, 0), 8)
+    ground_left = AssetManager.get_frame(path, CELL_SIZE, CELL_SIZE, 1, (0, 0, 0), 6, 1)
+    ground_center = AssetManager.get_frame(path, CELL_SIZE, CELL_SIZE, 1, (0, 0, 0), 7, 1)
+    ground_right = AssetManager.get_frame(path, CELL_SIZE, CELL_SIZE, 1, (0, 0, 0), 8, 1)
 
     # dict used for which building blocks are used for each platform
     # each platform property will have 4 building blocks
@@ -63,11 +57,9 @@ class Platform(pg.sprite.Sprite):
       Platforms.GROUND_GRASS_PATCH_LEFT: [],
       Platforms.GROUND_GRASS_PATCH_RIGHT: [],
     }
-    # iterate over the property keys in in platform_property dictionary
-    for prop_keys in platform_properties:
-      # build a block
+    # builds the block of a platform type out of its building blocks
+    def build_block(properties):
       platform_surface = pg.Surface((PLATFORM_SIZE, PLATFORM_SIZE))
-      properties = platform_properties[prop_keys]
       # if there are properties, build it using the the building blocks 
       # blocks that aren't really needed and has no property will just be skipped
       if len(properties) > 0:
@@ -78,5 +70,14 @@ class Platform(pg.sprite.Sprite):
         platform_surface = pg.transform.scale(platform_surface, # now that we have all the blocks in the surface, as 32x32 block we scale by 2x, resulting in a 64x64 block
                                               (SCALED_PLAT_SIZE, 
                                               SCALED_PLAT_SIZE))
+      return platform_surface
+
+    # start from an empty list, so calling this again does not add the blocks twice
+    Platform.surface_types = []
+    # iterate over the property keys in in platform_property dictionary
+    for prop_keys in platform_properties:
+      properties = platform_properties[prop_keys]
+      # build a block, only the first time for the whole game
+      platform_surface = AssetManager.get_surface(('platform', prop_keys.value), lambda: build_block(properties))
       # place a block into the static variable
       Platform.surface_types.append(platform_surface)
\ No newline at end of file
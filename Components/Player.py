@@ -1,7 +1,7 @@
 import pygame as pg
 from Enums import *
 from Constants import *
-from .Spritesheet import Spritesheet
+from .AssetManager import AssetManager
 from .Goal import Goal
 from .Platform import Platform
 
@@ -25,6 +25,12 @@ class Player(pg.sprite.Sprite):
       self.rect = self.surf.get_rect()
       # position of player
       self.rect.center = (64 * 3, 64 * 10)
+      # exact position (top left) of the player, the rect only holds whole pixels
+      self.position = pg.Vector2(self.rect.topleft)
+      # position before the last physics step, used to draw the player between two steps
+      self.previous_position = pg.Vector2(self.position)
+      # where the player is drawn
+      self.draw_rect = self.rect.copy()
       # current speed of player
       self.velocity = pg.Vector2(0, 0)
       # is the player jumping
@@ -47,25 +53,25 @@ class Player(pg.sprite.Sprite):
         'frames': 11,
         'path': idle_path,
         'image': [],
-        'spritesheet': None
+        'flipped': [],
       },
       PlayerState.FALL: {
         'frames': 1,
         'path': fall_path,
         'image': [],
-        'spritesheet': None
+        'flipped': [],
       },
       PlayerState.JUMP: {
         'frames': 1,
         'path': jump_path,
         'image': [],
-        'spritesheet': None
+        'flipped': [],
       },
       PlayerState.RUN: {
         'frames': 12,
         'path': run_path,
         'image': [],
-        'spritesheet': None
+        'flipped': [],
       },
     }
 		# for each dictionary key in animation_sprites
@@ -74,26 +80,21 @@ class Player(pg.sprite.Sprite):
       anim_sprite = self.animation_sprites[animation_name]
       path = anim_sprite["path"]
       frames = anim_sprite["frames"]
-      images = anim_sprite["image"]
-      # load the image
-      image = pg.image.load(path).convert_alpha()
-      # load the image through spritesheet class
-      spritesheet = Spritesheet(image)
-      # store spritesheet into this animation's spritesheet property
-      anim_sprite["spritesheet"] = spritesheet
-      # for each frame in the image, store it into images[]
-      for frame in range(frames):
-        images.append(spritesheet.get_image(ASSET_SIZE, ASSET_SIZE, 1, (0, 0, 0), frame))
-
-  def animate(self):
+      # store the frames of the image, shared with every other player
+      anim_sprite["image"] = AssetManager.get_frames(path, ASSET_SIZE, ASSET_SIZE, 1, (0, 0, 0), frames)
+      # store the frames facing left, flipped along X axis
+      anim_sprite["flipped"] = AssetManager.get_frames(path, ASSET_SIZE, ASSET_SIZE, 1, (0, 0, 0), frames, flipped=True)
+
+  """
+    Advances the animation by dt seconds, the animation speed is in frames per 1/FPS of a second
+  """
+  def animate(self, dt):
     animation = self.animation_sprites[self.state]
-    self.frame_index += self.animation_speed
+    self.frame_index += self.animation_speed * FPS * dt
     if (self.frame_index >= animation["frames"]):
       self.frame_index = 0
-    self.surf = animation["image"][int(self.frame_index)]
-    if (not self.facing_right):
-      # flip along X axis to face left
-      self.surf = pg.transform.flip(self.surf, True, False).convert_alpha()
+    # use the flipped frames to face left
+    self.surf = animation["image" if self.facing_right else "flipped"][int(self.frame_index)]
 
 
   def event_direction(self, direction):
@@ -107,39 +108,89 @@ class Player(pg.sprite.Sprite):
       self.velocity.y = -JUMP_VELOCITY
       self.on_floor = False
   """
-    Updates the current state of the object, called by the main state
+    Updates the current state of the object by one physics step of dt seconds, called by the main state
   """
   def update(self, dt, state):
+    self.previous_position.update(self.position)
     # if player fell through a hole
     if (self.rect.top >= pg.display.get_surface().get_height()):
       state.game_over()
+    # with the scrolling camera there are no screens to go to, only the ends of the world
+    if state.camera is not None:
+      self.keep_in_world(state.camera.world_width)
     # check if going to next screen
-    if self.velocity.x > 0 and self.rect.right > pg.display.get_surface().get_width():
+    elif self.velocity.x > 0 and self.rect.right > pg.display.get_surface().get_width():
       if state.view >= state.MAX_VIEW: # if player is at last view
         self.rect.right = pg.display.get_surface().get_width()
+        self.position.x = self.rect.x
       else:
         state.next_view()              # else go to previous view
         self.rect.x = 2                # place the player on the right most side of the screen
+        self.teleport()
     # check if player can go to previous screen
-    if self.velocity.x < 0 and self.rect.x < 0:
+    elif self.velocity.x < 0 and self.rect.x < 0:
       if state.view == 0:           # if player is at first view
         self.rect.left = 0
+        self.position.x = self.rect.x
       else:                         # else increment view
         state.prev_view()
         self.rect.x = pg.display.get_surface().get_width() - 2  # place the player on the left most side of the screen
+        self.teleport()
 
+    # tile grid of the view when using the "grid" collision backend
+    collider = state.get_collider()
     # handle x-axis displacements
-    dx = (self.velocity.x * dt)
-    self.rect.x += dx
-    self.handle_horizontal_collisions(state)
-    # handle y-axis displacements
-    self.velocity.y += FALL_VELOCITY
-    dy = (self.velocity.y * dt)
-    self.rect.y += dy
-    self.handle_vertical_collisions(state)
+    self.position.x += self.velocity.x * dt
+    if collider is None:
+      self.rect.x = round(self.position.x)
+      self.handle_horizontal_collisions(state)
+    else:
+      self.rect.x = collider.sweep_x(self.rect, round(self.position.x))
+      self.collect_goals(collider, state)
+    # a collision moved the player, continue from where it was placed
+    if self.rect.x != round(self.position.x):
+      self.position.x = self.rect.x
+    # handle y-axis displacements, FALL_VELOCITY is the gravity per 1/FPS of a second
+    self.velocity.y += FALL_VELOCITY * FPS * dt
+    self.position.y += self.velocity.y * dt
+    if collider is None:
+      self.rect.y = round(self.position.y)
+      self.handle_vertical_collisions(state)
+    else:
+      self.rect.y = collider.sweep_y(self.rect, round(self.position.y))
+      # stopped by a platform
+      if self.rect.y != round(self.position.y):
+        self.land(self.velocity.y > 0)
+      self.collect_goals(collider, state)
+    if self.rect.y != round(self.position.y):
+      self.position.y = self.rect.y
 
     self.update_state()
-    self.animate()
+
+  """
+    Stops the player at the left and right ends of a world world_width pixels wide
+  """
+  def keep_in_world(self, world_width):
+    if self.velocity.x > 0 and self.rect.right > world_width:
+      self.rect.right = world_width
+      self.position.x = self.rect.x
+    elif self.velocity.x < 0 and self.rect.x < 0:
+      self.rect.left = 0
+      self.position.x = self.rect.x
+
+  """
+    Moves the exact position to where the rect was placed, without drawing the player in between
+  """
+  def teleport(self):
+    self.position.update(self.rect.topleft)
+    self.previous_position.update(self.position)
+
+  """
+    Returns where to draw the player, alpha is how far (0 to 1) the time is between the last two physics steps
+  """
+  def get_draw_rect(self, alpha):
+    position = self.previous_position.lerp(self.position, alpha)
+    return self.surf.get_rect(topleft=(round(position.x), round(position.y)))
 
   def stop(self):
     self.velocity.x = 0
@@ -148,8 +199,8 @@ class Player(pg.sprite.Sprite):
     Handles the horizontal collision, basically avoiding to go through platforms and collect goals
   """
   def handle_horizontal_collisions(self, state):
-    # check if colliding with entities (either a goal or a platform)
-    for entity in state.get_entities():
+    # check if colliding with entities near the player (either a goal or a platform, merged into rectangles)
+    for entity in state.get_index().query(self.rect):
       # if collided with a goal
       if isinstance(entity, Goal) and self.rect.colliderect(entity.collideRect) and not entity.collected:
         entity.collect()                            # update goal state
@@ -163,8 +214,8 @@ class Player(pg.sprite.Sprite):
     Handles the vertical collision, basically avoiding to go through platforms and collect goals
   """
   def handle_vertical_collisions(self, state):
-    # check if colliding with entities (either a goal or a platform)
-    for entity in state.get_entities():
+    # check if colliding with entities near the player (either a goal or a platform, merged into rectangles)
+    for entity in state.get_index().query(self.rect):
       # if collided with a goal
       if isinstance(entity, Goal) and self.rect.colliderect(entity.collideRect) and not entity.collected:
         entity.collect()                      # update goal state
@@ -178,6 +229,23 @@ class Player(pg.sprite.Sprite):
           self.velocity.y = 0
           self.on_floor = True
   
+  """
+    Collects the goals touched by the player, using the tile grid of the view
+  """
+  def collect_goals(self, collider, state):
+    for goal in collider.goals_at(self.rect):
+      if self.rect.colliderect(goal.collideRect) and not goal.collected:
+        goal.collect()                        # update goal state
+        state.add_collected(goal)             # mark the goal as collected
+
+  """
+    Stops the vertical movement after hitting a platform, on_floor when it was hit going down
+  """
+  def land(self, on_floor):
+    self.velocity.y = 0
+    if on_floor:
+      self.on_floor = True
+
   """
     Updates the jumped data member with the value passed
   """
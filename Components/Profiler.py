@@ -0,0 +1,120 @@
+import csv
+import json
+import time
+from collections import deque
+import pygame as pg
+
+"""
+  Times the phases of each frame (events, updates, drawing) and keeps the last frames,
+  so they can be shown as a graph on top of the game or exported as a Chrome trace or a CSV.
+  A phase is timed between start(name) and stop(name), next_frame() closes the current frame.
+"""
+class Profiler():
+  # colour of each phase in the overlay graph, other phases are drawn in white
+  COLOURS = {
+    "events": (255, 200, 0),
+    "update.entities": (0, 200, 255),
+    "update.player": (0, 90, 255),
+    "draw.text": (255, 120, 200),
+    "draw.blits": (0, 220, 100),
+    "draw.flip": (200, 0, 0),
+  }
+
+  def __init__(self, window=300):
+    # the amount of frames kept
+    self.window = window
+    # the durations (in seconds) of each phase of the last frames, one dict per frame
+    self.frames = deque(maxlen=window)
+    # the durations of the phases of the frame being timed
+    self.current = {}
+    # phase name -> time it was started
+    self.started = {}
+    # (name, frame number, start, duration) of the last timed phases, for the trace
+    self.events = deque(maxlen=window * len(Profiler.COLOURS))
+    # number of the frame being timed
+    self.frame = 0
+
+  """
+    Starts timing a phase
+  """
+  def start(self, name):
+    self.started[name] = time.perf_counter()
+
+  """
+    Stops timing a phase, a phase timed more than once in a frame adds up
+  """
+  def stop(self, name):
+    end = time.perf_counter()
+    start = self.started.pop(name)
+    self.current[name] = self.current.get(name, 0) + end - start
+    self.events.append((name, self.frame, start, end - start))
+
+  """
+    Closes the frame being timed and starts a new one
+  """
+  def next_frame(self):
+    if self.current:
+      self.frames.append(self.current)
+      self.current = {}
+    self.frame += 1
+
+  """
+    Returns the mean duration in milliseconds of each phase over the last frames
+  """
+  def averages(self):
+    totals = {}
+    for frame in self.frames:
+      for name, duration in frame.items():
+        totals[name] = totals.get(name, 0) + duration
+    return {name: total * 1000 / len(self.frames) for name, total in totals.items()}
+
+  """
+    Draws the last frames as stacked bars, one bar per frame, height is milliseconds times scale
+    Returns a transparent surface of the given size
+  """
+  def render_overlay(self, size=(300, 100), scale=5):
+    width, height = size
+    surface = pg.Surface(size, pg.SRCALPHA)
+    surface.fill((0, 0, 0, 120))
+    # line at the time of a frame at 60 FPS
+    budget_y = height - 1000 / 60 * scale
+    if budget_y > 0:
+      pg.draw.line(surface, (255, 255, 255), (0, budget_y), (width, budget_y))
+    frames = list(self.frames)[-width:]
+    for x, frame in enumerate(frames, width - len(frames)):
+      y = height
+      for name, duration in frame.items():
+        bar = duration * 1000 * scale
+        pg.draw.line(surface, Profiler.COLOURS.get(name, (255, 255, 255)), (x, y), (x, y - bar))
+        y -= bar
+    return surface
+
+  """
+    Writes the timed phases as a Chrome trace (chrome://tracing, Perfetto)
+  """
+  def export_chrome_trace(self, path):
+    trace = [{
+      "name": name,
+      "cat": name.split(".")[0],
+      "ph": "X",
+      "ts": start * 1000000,
+      "dur": duration * 1000000,
+      "pid": 0,
+      "tid": 0,
+      "args": {"frame": frame},
+    } for name, frame, start, duration in self.events]
+    with open(path, "w") as trace_file:
+      json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, trace_file)
+
+  """
+    Writes the duration in milliseconds of each phase of the last frames, one row per frame
+  """
+  def export_csv(self, path):
+    names = []
+    for frame in self.frames:
+      names.extend(name for name in frame if name not in names)
+    with open(path, "w", newline="") as csv_file:
+      writer = csv.writer(csv_file)
+      writer.writerow(["frame"] + names)
+      for number, frame in enumerate(self.frames):
+        writer.writerow([number] + [frame.get(name, 0) * 1000 for name in names])
@@ -0,0 +1,104 @@
+"""
+  A layer of things to draw. Sprites are drawn with their current surf and rect (or another rect
+  attribute), so they can animate; items are fixed (key, surface, rect) given when they change.
+"""
+class RenderLayer():
+  def __init__(self, name, rect_attribute='rect'):
+    self.name = name
+    # attribute of the sprites holding where they are drawn
+    self.rect_attribute = rect_attribute
+    # sprites of the layer, the list is kept (not copied) so it can change from outside
+    self.sprites = []
+    # (key, surface, rect) of the fixed things of the layer
+    self.items = []
+    # (surface, rect) of the items, ready to be blitted
+    self.item_sequence = []
+    # moves the sprites when they are drawn, the opposite of the camera position
+    self.offset = (0, 0)
+
+  """
+    Sets the sprites of the layer
+  """
+  def set_sprites(self, sprites):
+    self.sprites = sprites
+
+  """
+    Sets how much the sprites are moved when drawn, so sprites in world coordinates are drawn where the camera shows them
+  """
+  def set_offset(self, offset):
+    self.offset = offset
+
+  """
+    Sets the fixed items of the layer, as a list of (key, surface, rect)
+  """
+  def set_items(self, items):
+    self.items = items
+    self.item_sequence = [(surface, rect) for _, surface, rect in items]
+
+  """
+    Returns the (surface, rect) of everything in the layer, in drawing order
+  """
+  def sequence(self):
+    if not self.sprites:
+      return self.item_sequence
+    attribute = self.rect_attribute
+    if self.offset != (0, 0):
+      x, y = self.offset
+      return [(sprite.surf, getattr(sprite, attribute).move(x, y)) for sprite in self.sprites] + self.item_sequence
+    return [(sprite.surf, getattr(sprite, attribute)) for sprite in self.sprites] + self.item_sequence
+
+  """
+    Returns (key, token, surface, rect) of everything in the layer, used by the DirtyRenderer
+  """
+  def drawables(self):
+    attribute = self.rect_attribute
+    x, y = self.offset
+    drawables = [(sprite, sprite.surf, sprite.surf, getattr(sprite, attribute).move(x, y)) for sprite in self.sprites]
+    drawables.extend((key, surface, surface, rect) for key, surface, rect in self.items)
+    return drawables
+
+"""
+  Draws a list of layers in order, each layer with a single Surface.blits call.
+  Keeps how many calls and blits the last frame needed.
+"""
+class RenderPipeline():
+  def __init__(self, layers):
+    # the layers, in drawing order
+    self.layers = layers
+    # name -> layer
+    self.layers_by_name = {layer.name: layer for layer in self.layers}
+    # blits calls made on the last frame
+    self.draw_calls = 0
+    # surfaces drawn on the last frame
+    self.blit_count = 0
+
+  """
+    Returns a layer by its name
+  """
+  def layer(self, name):
+    return self.layers_by_name[name]
+
+  """
+    Draws every layer onto the surface
+  """
+  def render(self, surface):
+    draw_calls = 0
+    blit_count = 0
+    for layer in self.layers:
+      sequence = layer.sequence()
+      if sequence:
+        surface.blits(sequence, False)
+        draw_calls += 1
+        blit_count += len(sequence)
+    self.draw_calls = draw_calls
+    self.blit_count = blit_count
+
+  """
+    Returns (key, token, surface, rect) of every layer but the excluded ones, used by the DirtyRenderer
+  """
+  def drawables(self, exclude=()):
+    drawables = []
+    for layer in self.layers:
+      if layer.name not in exclude:
+        drawables.extend(layer.drawables())
+    return drawables
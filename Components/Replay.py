@@ -0,0 +1,193 @@
+import hashlib
+import struct
+import time
+import zlib
+from .ScriptedKeys import ScriptedKeys
+
+"""
+  Actions recorded on each tick, one bit per action
+"""
+RECORDED_ACTIONS = ["left", "right", "jump", "restart"]
+
+"""
+  Returns the bits of the recorded actions held (InputActions)
+"""
+def actions_to_bits(actions):
+  bits = 0
+  for bit, action in enumerate(RECORDED_ACTIONS):
+    if actions.is_held(action):
+      bits |= 1 << bit
+  return bits
+
+"""
+  Returns the bits of the recorded actions pressed on the frame (InputActions). A key going down
+  and up within a frame presses its action without it ever being held, so the presses are recorded too
+"""
+def pressed_to_bits(actions):
+  bits = 0
+  for bit, action in enumerate(RECORDED_ACTIONS):
+    if actions.was_pressed(action):
+      bits |= 1 << bit
+  return bits
+
+"""
+  Presses the actions of the bits on the next update of the actions
+"""
+def press_bits(bits, actions):
+  for bit, action in enumerate(RECORDED_ACTIONS):
+    if bits & (1 << bit):
+      actions.press(action)
+
+"""
+  Returns keys that hold the actions of the bits, using the first key bound to each action
+"""
+def bits_to_keys(bits, actions):
+  return ScriptedKeys(actions.bindings[action][0] for bit, action in enumerate(RECORDED_ACTIONS) if bits & (1 << bit))
+
+"""
+  Hash of the trajectory of a game: the exact position and velocity of the player, the view and
+  the goals collected after every tick. Two runs with the same digest behaved the same.
+"""
+class TrajectoryDigest():
+  TICK = struct.Struct('<ddddiI')
+
+  def __init__(self):
+    self.hash = hashlib.sha256()
+    # (tick, view, goals collected) each time a goal is collected
+    self.collected = []
+    # ticks digested
+    self.ticks = 0
+    # goals collected at the last tick
+    self.num_collected = 0
+
+  """
+    Adds the state of the game after a tick
+  """
+  def update(self, state):
+    player = state.player
+    self.hash.update(TrajectoryDigest.TICK.pack(player.position.x, player.position.y, player.velocity.x,
+                                                 player.velocity.y, state.view, state.num_collected))
+    if state.num_collected > self.num_collected:
+      self.collected.append((self.ticks, state.view, state.num_collected))
+    self.num_collected = state.num_collected
+    self.ticks += 1
+
+  def hexdigest(self):
+    return self.hash.hexdigest()
+
+"""
+  Records the actions held and pressed and the delta time of each tick of a game, from a restart, and saves
+  them to a compact file that InputReplayer plays back. The file also keeps the world played
+  and the digest of the trajectory, so a replay can tell if it behaved the same.
+
+  File: header (magic, version, physics steps per second, world path, world sha1, ticks, digest)
+  followed by zlib compressed runs of (actions held, actions pressed, dt, ticks) with the same
+  actions and delta time.
+"""
+class InputRecorder():
+  MAGIC = b'PREC'
+  VERSION = 2
+  HEADER = struct.Struct('<4sBHI32s20sH')
+  RUN = struct.Struct('<BBdI')
+
+  def __init__(self, path):
+    # where the recording is saved
+    self.path = path
+    # [actions held, actions pressed, dt, ticks] runs
+    self.runs = []
+    self.digest = TrajectoryDigest()
+    self.world = None
+    self.physics_hz = 0
+
+  """
+    Restarts the game so the recording starts from a fresh world
+  """
+  def start(self, state):
+    state.restart()
+    self.world = state.world
+    self.physics_hz = round(1 / state.physics_step)
+    self.runs = []
+    self.digest = TrajectoryDigest()
+
+  """
+    Records the actions held and pressed (InputActions) and the delta time of a tick, called before the tick is updated
+  """
+  def record(self, actions, dt):
+    bits = actions_to_bits(actions)
+    pressed = pressed_to_bits(actions)
+    if self.runs and self.runs[-1][0] == bits and self.runs[-1][1] == pressed and self.runs[-1][2] == dt:
+      self.runs[-1][3] += 1
+    else:
+      self.runs.append([bits, pressed, dt, 1])
+
+  """
+    Adds the state of the game after a tick to the digest
+  """
+  def track(self, state):
+    self.digest.update(state)
+
+  """
+    Writes the recording to its file
+  """
+  def save(self):
+    with open(self.world, 'rb') as world_file:
+      world_hash = hashlib.sha1(world_file.read()).digest()
+    world = self.world.encode('utf-8')
+    body = zlib.compress(b''.join(InputRecorder.RUN.pack(*run) for run in self.runs))
+    with open(self.path, 'wb') as recording:
+      recording.write(InputRecorder.HEADER.pack(InputRecorder.MAGIC, InputRecorder.VERSION, self.physics_hz,
+                                                self.digest.ticks, bytes.fromhex(self.digest.hexdigest()),
+                                                world_hash, len(world)))
+      recording.write(world)
+      recording.write(body)
+
+"""
+  Plays back a recording made by InputRecorder through State.events_handler, as fast as possible,
+  and checks the game behaved exactly as when it was recorded.
+"""
+class InputReplayer():
+  def __init__(self, path):
+    with open(path, 'rb') as recording:
+      data = recording.read()
+    magic, version, self.physics_hz, self.ticks, digest, self.world_hash, world_length = InputRecorder.HEADER.unpack_from(data)
+    if magic != InputRecorder.MAGIC or version != InputRecorder.VERSION:
+      raise ValueError(path + ' is not a recording')
+    # digest of the recorded trajectory
+    self.digest = digest.hex()
+    start = InputRecorder.HEADER.size
+    # world the recording was made on
+    self.world = data[start:start + world_length].decode('utf-8')
+    body = zlib.decompress(data[start + world_length:])
+    # (actions held, actions pressed, dt, ticks) runs
+    self.runs = list(InputRecorder.RUN.iter_unpack(body))
+
+  """
+    Replays the recording on a state (created with the recorded world and physics rate),
+    returns the ticks played, the time it took, the goals collected and if the trajectory matched
+  """
+  def run(self, state):
+    with open(state.world, 'rb') as world_file:
+      if hashlib.sha1(world_file.read()).digest() != self.world_hash:
+        raise ValueError(state.world + ' is not the world the recording was made on')
+    state.restart()
+    state.actions.reset()
+    digest = TrajectoryDigest()
+    started = time.perf_counter()
+    for bits, pressed, dt, ticks in self.runs:
+      keys = bits_to_keys(bits, state.actions)
+      for _ in range(ticks):
+        state.dt = dt
+        # taps shorter than a frame are not in the keys held
+        press_bits(pressed, state.actions)
+        state.events_handler(keys)
+        state.update()
+        digest.update(state)
+    elapsed = time.perf_counter() - started
+    return {
+      "ticks": digest.ticks,
+      "seconds": elapsed,
+      "ticks_per_second": digest.ticks / elapsed if elapsed > 0 else 0,
+      "collected": digest.collected,
+      "digest": digest.hexdigest(),
+      "matches": digest.ticks == self.ticks and digest.hexdigest() == self.digest,
+    }
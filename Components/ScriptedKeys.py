@@ -0,0 +1,11 @@
+"""
+  Stands in for pg.key.get_pressed() when the game is not driven by the keyboard,
+  keys[key] is True for the keys given as pressed.
+"""
+class ScriptedKeys():
+  def __init__(self, pressed=()):
+    # the keys pressed
+    self.pressed = frozenset(pressed)
+
+  def __getitem__(self, key):
+    return key in self.pressed
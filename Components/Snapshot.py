@@ -0,0 +1,99 @@
+import struct
+
+"""
+  Everything of a game that changes while playing: the player's position, velocity and animation,
+  the view, the goals collected and the timers. The views themselves (platforms, goals) are not in
+  it, they never change, so State.restore puts a game back to a snapshot without rebuilding them.
+  Snapshots are small and can be saved to disk, as checkpoints, or copied to fork a simulation.
+
+  File: header (magic, version, world path length), world path, player, game,
+  number of goals collected followed by (view, x, y) of the center of each.
+"""
+class Snapshot():
+  MAGIC = b'PSNP'
+  VERSION = 1
+  HEADER = struct.Struct('<4sBH')
+  # position, previous position, velocity, rect and draw rect top left, on floor, jumped,
+  # facing right, animation state, frame index
+  PLAYER = struct.Struct('<6d4i3?Bd')
+  # view, goals collected, player dead, completed, accumulator, alpha, animation clock
+  GAME = struct.Struct('<iI??3d')
+  COLLECTED = struct.Struct('<Iii')
+
+  def __init__(self, world, player, game, collected):
+    # path of the world the snapshot was taken in
+    self.world = world
+    # the fields of PLAYER and GAME, in order
+    self.player = player
+    self.game = game
+    # view -> centers of the goals collected in the view
+    self.collected = collected
+
+  """
+    Returns the snapshot of the current state of a game
+  """
+  def capture(state):
+    player = state.player
+    return Snapshot(
+      state.world,
+      (player.position.x, player.position.y, player.previous_position.x, player.previous_position.y,
+       player.velocity.x, player.velocity.y, player.rect.x, player.rect.y, player.draw_rect.x, player.draw_rect.y,
+       player.on_floor, player.jumped, player.facing_right, player.state.value, player.frame_index),
+      (state.view, state.num_collected, state.player_dead, state.completed, state.accumulator, state.alpha,
+       state.animations.elapsed),
+      {view: frozenset(centers) for view, centers in state.streamer.collected.items() if centers},
+    )
+
+  def to_bytes(self):
+    world = self.world.encode('utf-8')
+    parts = [
+      Snapshot.HEADER.pack(Snapshot.MAGIC, Snapshot.VERSION, len(world)),
+      world,
+      Snapshot.PLAYER.pack(*self.player),
+      Snapshot.GAME.pack(*self.game),
+    ]
+    collected = [(view, x, y) for view, centers in sorted(self.collected.items()) for x, y in sorted(centers)]
+    parts.append(struct.pack('<I', len(collected)))
+    parts.extend(Snapshot.COLLECTED.pack(*goal) for goal in collected)
+    return b''.join(parts)
+
+  """
+    Reads the bytes of to_bytes, raises ValueError when they are not a snapshot
+  """
+  def from_bytes(data):
+    try:
+      return Snapshot.unpack(data)
+    except struct.error:
+      raise ValueError('truncated snapshot')
+
+  def unpack(data):
+    magic, version, world_length = Snapshot.HEADER.unpack_from(data)
+    if magic != Snapshot.MAGIC or version != Snapshot.VERSION:
+      raise ValueError('not a snapshot')
+    offset = Snapshot.HEADER.size
+    world = bytes(data[offset:offset + world_length]).decode('utf-8')
+    offset += world_length
+    player = Snapshot.PLAYER.unpack_from(data, offset)
+    offset += Snapshot.PLAYER.size
+    game = Snapshot.GAME.unpack_from(data, offset)
+    offset += Snapshot.GAME.size
+    count, = struct.unpack_from('<I', data, offset)
+    offset += 4
+    collected = {}
+    for view, x, y in Snapshot.COLLECTED.iter_unpack(data[offset:offset + count * Snapshot.COLLECTED.size]):
+      collected.setdefault(view, set()).add((x, y))
+    return Snapshot(world, player, game, {view: frozenset(centers) for view, centers in collected.items()})
+
+  """
+    Writes the snapshot to a file, e.g. a checkpoint
+  """
+  def save(self, path):
+    with open(path, 'wb') as snapshot_file:
+      snapshot_file.write(self.to_bytes())
+
+  """
+    Reads a snapshot written by save
+  """
+  def load(path):
+    with open(path, 'rb') as snapshot_file:
+      return Snapshot.from_bytes(snapshot_file.read())
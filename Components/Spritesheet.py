@@ -17,4 +17,10 @@ class Spritesheet():
 		image.blit(self.sheet, (0, 0), ((frameCol * width, frameRow * height, width, height)))
 		image = pygame.transform.scale(image, (width * scale, height * scale))
 		image.set_colorkey(colour)
-		return image
\ No newline at end of file
+		return image
+
+	# returns a mirrored copy of each frame, so sprites facing the other direction do not flip on every frame
+	# the copies keep the pixel format and colour key of the frames, so they are packed in the same atlas pages
+	# do not pass self since we want this to be a static function to be called
+	def flip_images(images, flip_x=True, flip_y=False):
+		return [pygame.transform.flip(image, flip_x, flip_y) for image in images]
\ No newline at end of file
@@ -0,0 +1,70 @@
+import pygame as pg
+from .Platform import Platform
+
+"""
+  Pre-rendered background of each view. Platforms never move nor animate, so instead of
+  blitting every block on every frame, all the blocks of a view are drawn once into a single
+  surface that is blitted as a whole.
+  Views are baked the first time they are shown, so big worlds do not bake views never visited.
+  With the scrolling camera the baked views are the chunks the visible part of the world is drawn from.
+"""
+class StaticLayer():
+  def __init__(self, size, background):
+    # size of the baked surfaces, same as the screen
+    self.size = size
+    # colour behind the platforms
+    self.background = background
+    # view -> (signature, baked surface or None if not baked yet)
+    self.surfaces = {}
+    # view -> entities of the view, used to bake it
+    self.entities_per_view = {}
+    # view -> top left of the view in the coordinates of its entities
+    self.origins = {}
+
+  """
+    Sets the entities (EntityStore) of a view, a view whose tiles did not change keeps its surface
+    origin is where the view starts when its entities are placed in world coordinates (scrolling camera)
+  """
+  def set_view(self, view, entities, origin=(0, 0)):
+    self.entities_per_view[view] = entities
+    self.origins[view] = origin
+    signature = entities.signature()
+    cached = self.surfaces.get(view)
+    if cached is None or cached[0] != signature:
+      self.surfaces[view] = (signature, None)
+
+  """
+    Forgets a view and its surface (e.g. when the view is no longer in memory)
+  """
+  def remove_view(self, view):
+    self.entities_per_view.pop(view, None)
+    self.origins.pop(view, None)
+    self.surfaces.pop(view, None)
+
+  """
+    Draws the background colour and all the platforms of a view into one surface
+  """
+  def bake(self, entities, origin=(0, 0)):
+    surface = pg.Surface(self.size).convert()
+    surface.fill(self.background)
+    origin_x, origin_y = origin
+    surfaces = Platform.surface_types
+    surface.blits([(surfaces[tile], (x - origin_x, y - origin_y)) for tile, x, y in entities.platforms()], False)
+    return surface
+
+  """
+    Forces a view to be baked again the next time it is shown
+  """
+  def invalidate(self, view):
+    if view in self.surfaces:
+      self.surfaces[view] = (self.surfaces[view][0], None)
+
+  """
+    Returns the baked surface of a view, baking it if needed
+  """
+  def get(self, view):
+    signature, surface = self.surfaces[view]
+    if surface is None:
+      surface = self.bake(self.entities_per_view[view], self.origins[view])
+      self.surfaces[view] = (signature, surface)
+    return surface
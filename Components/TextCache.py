@@ -0,0 +1,37 @@
+from collections import OrderedDict
+
+"""
+  Cache of rendered text surfaces. Rendering text is slow and the same strings are drawn
+  on every frame, so each surface is kept and reused, keyed by (string, colour, antialias, font).
+  Only the most recently used max_size surfaces are kept.
+"""
+class TextCache():
+  def __init__(self, max_size=64):
+    # the maximum amount of surfaces kept
+    self.max_size = max_size
+    # key -> rendered surface, the least recently used first
+    self.surfaces = OrderedDict()
+
+  """
+    Returns the surface of the text, rendering it only if it is not in the cache
+  """
+  def render(self, font, text, antialias, color):
+    # colours can be given as lists or pg.Color, which can't be used as a key
+    key = (text, color if isinstance(color, str) else tuple(color), antialias, font)
+    surface = self.surfaces.get(key)
+    if surface is not None:
+      # mark as the most recently used
+      self.surfaces.move_to_end(key)
+      return surface
+    surface = font.render(text, antialias, color)
+    self.surfaces[key] = surface
+    # evict the least recently used surface
+    if len(self.surfaces) > self.max_size:
+      self.surfaces.popitem(last=False)
+    return surface
+
+  """
+    Removes every surface from the cache
+  """
+  def clear(self):
+    self.surfaces.clear()
@@ -0,0 +1,175 @@
+import pygame as pg
+
+"""
+  Packs many small surfaces (the frames of the sprite sheets) into a few large pages and hands out
+  subsurfaces of them. A subsurface shares the pixels of its page, so it is drawn like any other
+  surface but the frames live side by side in memory instead of one allocation each.
+  Surfaces are packed in shelves: rows of the page, as tall as the first surface placed in them,
+  filled left to right. The pixels of a shelf are allocated when the shelf is opened, so a page
+  only uses the memory of the shelves it has, never of the whole page size.
+  Surfaces with a different pixel format or colour key go to other pages.
+"""
+class TextureAtlas():
+  def __init__(self, page_size=(1024, 1024), padding=1):
+    # size of the pages, surfaces bigger than a page get a page of their own
+    self.page_size = page_size
+    # empty pixels left between the surfaces of a shelf
+    self.padding = padding
+    # every page, in the order they were created
+    self.pages = []
+
+  """
+    Copies a surface into the atlas, returns the subsurface holding it
+  """
+  def add(self, surface):
+    width, height = surface.get_size()
+    page = None
+    position = None
+    for candidate in self.pages:
+      if candidate.accepts(surface):
+        position = candidate.allocate(width, height, self.padding)
+        if position is not None:
+          page = candidate
+          break
+    if page is None:
+      page_size = (max(self.page_size[0], width), max(self.page_size[1], height))
+      page = AtlasPage(page_size, surface)
+      self.pages.append(page)
+      position = page.allocate(width, height, self.padding)
+    shelf, x = position
+    strip = page.strips[shelf]
+    # the shelf is empty (all zeros), adding the frame to it copies its pixels and alpha as they are
+    strip.blit(surface, (x, 0), special_flags=pg.BLEND_RGBA_ADD)
+    page.frames += 1
+    page.used += width * height
+    return strip.subsurface(pg.Rect(x, 0, width, height))
+
+  """
+    Returns the occupancy and memory of every page and of the whole atlas.
+    frame_bytes is the memory of the frames themselves and full_page_bytes what the pages would use
+    if they were allocated whole, saved_bytes is how much growing the pages shelf by shelf saves
+  """
+  def report(self):
+    pages = [page.report() for page in self.pages]
+    area = sum(page['area'] for page in pages)
+    used = sum(page['used'] for page in pages)
+    allocated = sum(page['bytes'] for page in pages)
+    full_pages = sum(page.full_bytes() for page in self.pages)
+    return {
+      'pages': pages,
+      'frames': sum(page['frames'] for page in pages),
+      'occupancy': used / area if area else 0,
+      'bytes': allocated,
+      'frame_bytes': sum(page['frame_bytes'] for page in pages),
+      'full_page_bytes': full_pages,
+      'saved_bytes': full_pages - allocated,
+    }
+
+  """
+    Returns the amount of bytes used by the pixels of the pages
+  """
+  def memory_usage(self):
+    return sum(page.bytes() for page in self.pages)
+
+  """
+    Forgets every page, the subsurfaces handed out keep their shelves alive until they are dropped
+  """
+  def clear(self):
+    self.pages = []
+
+  """
+    Adds a page that was already filled (e.g. loaded from the asset cache), strips are the pixels of its shelves
+  """
+  def add_page(self, size, shelves, strips, frames, used):
+    page = AtlasPage(size, strips[0])
+    page.shelves = shelves
+    page.strips = strips
+    page.frames = frames
+    page.used = used
+    self.pages.append(page)
+    return page
+
+"""
+  A page of a TextureAtlas, holding surfaces of a single pixel format and colour key, made of the
+  strips of pixels of its shelves
+"""
+class AtlasPage():
+  def __init__(self, size, template):
+    # most the shelves can cover
+    self.size = size
+    # pixel format and colour key of the page, the strips are made like it
+    self.template = pg.Surface((1, 1), template.get_flags() & pg.SRCALPHA, template)
+    self.template.set_colorkey(template.get_colorkey())
+    self.format = AtlasPage.format_of(template)
+    # [y, height, x where the next surface goes] of each shelf
+    self.shelves = []
+    # pixels of each shelf, as wide as the page and as tall as the shelf
+    self.strips = []
+    # surfaces added and pixels they cover
+    self.frames = 0
+    self.used = 0
+
+  """
+    Returns what surfaces must share to be on the same page
+  """
+  def format_of(surface):
+    return (surface.get_flags() & pg.SRCALPHA, surface.get_bitsize(), surface.get_masks(), surface.get_colorkey())
+
+  def accepts(self, surface):
+    return AtlasPage.format_of(surface) == self.format
+
+  """
+    Returns (shelf, x) of where a width x height surface fits on the page, None when the page is full
+  """
+  def allocate(self, width, height, padding):
+    page_width, page_height = self.size
+    # the shortest shelf tall enough with room left, so small surfaces don't waste tall shelves
+    best = None
+    for index, shelf in enumerate(self.shelves):
+      y, shelf_height, x = shelf
+      if height <= shelf_height and x + width <= page_width and (best is None or shelf_height < self.shelves[best][1]):
+        best = index
+    if best is not None:
+      shelf = self.shelves[best]
+      x = shelf[2]
+      shelf[2] += width + padding
+      return (best, x)
+    # open a new shelf under the last one
+    y = self.shelves[-1][0] + self.shelves[-1][1] if self.shelves else 0
+    if y + height > page_height or width > page_width:
+      return None
+    self.shelves.append([y, height, width + padding])
+    self.strips.append(self.new_strip(height))
+    return (len(self.shelves) - 1, 0)
+
+  """
+    Returns the empty pixels of a new shelf
+  """
+  def new_strip(self, height):
+    strip = pg.Surface((self.size[0], height), self.template.get_flags() & pg.SRCALPHA, self.template)
+    strip.fill((0, 0, 0, 0))
+    # set before any subsurface is made, they inherit it
+    strip.set_colorkey(self.template.get_colorkey())
+    return strip
+
+  def bytes(self):
+    return sum(strip.get_width() * strip.get_height() * strip.get_bytesize() for strip in self.strips)
+
+  """
+    Returns the bytes the page would use if it was allocated whole
+  """
+  def full_bytes(self):
+    return self.size[0] * self.size[1] * self.template.get_bytesize()
+
+  def report(self):
+    width = self.size[0]
+    height = sum(shelf[1] for shelf in self.shelves)
+    return {
+      'size': [width, height],
+      'frames': self.frames,
+      'area': width * height,
+      'used': self.used,
+      'occupancy': self.used / (width * height) if height else 0,
+      'bytes': self.bytes(),
+      'frame_bytes': self.used * self.template.get_bytesize(),
+    }
@@ -0,0 +1,110 @@
+try:
+  import numpy as np
+except ImportError:
+  np = None
+from .MapLoader import MapLoader
+
+"""
+  Collisions of a view against its tile grid instead of its sprites. The tiles are kept as a NumPy
+  array (one id per tile, as in the map file) and a moving rect is swept along one axis at a time:
+  only the rows and columns it crosses are looked at, and it stops at the first solid tile in its
+  way, so it can't go through a block no matter how fast it moves.
+  Needs NumPy, selected with COLLISION_BACKEND = "grid".
+  With the scrolling camera a single collider covers the whole world (TileMap.concatenated), and the
+  goals are added to it as the views holding them are built.
+"""
+class TileCollider():
+  def __init__(self, tile_map, view, goals, tile_size=64):
+    if np is None:
+      raise ImportError('the "grid" collision backend needs numpy (pip install numpy)')
+    self.tile_size = tile_size
+    size = tile_map.rows * tile_map.cols
+    # tile ids of the view, one row of the array per row of tiles
+    self.tiles = np.frombuffer(tile_map.tiles, dtype=np.uint8, count=size, offset=view * size).reshape(tile_map.rows, tile_map.cols).copy()
+    # tiles the player can't go through
+    self.solid = (self.tiles != MapLoader.TILE_EMPTY) & (self.tiles != MapLoader.TILE_GOAL)
+    # tiles holding a goal
+    self.goal_tiles = self.tiles == MapLoader.TILE_GOAL
+    # (row, col) -> Goal, used to collect them
+    self.goals = {}
+    self.add_goals(goals)
+
+  """
+    Adds goals to collect, replacing the goals that were on the same tiles
+  """
+  def add_goals(self, goals):
+    size = self.tile_size
+    for goal in goals:
+      self.goals[(goal.rect.top // size, goal.rect.left // size)] = goal
+
+  """
+    Removes the goals of the columns from first_col to end_col (exclusive), e.g. of a view removed from memory
+  """
+  def remove_goals(self, first_col, end_col):
+    self.goals = {cell: goal for cell, goal in self.goals.items() if not first_col <= cell[1] < end_col}
+
+  """
+    Returns the first and last rows (or columns) covered from start to end (exclusive) in pixels,
+    clipped to the grid. first > last when the span is outside the grid
+  """
+  def span(self, start, end, count):
+    return max(start // self.tile_size, 0), min((end - 1) // self.tile_size, count - 1)
+
+  """
+    Moves the rect horizontally to x, returns the x where it stops
+  """
+  def sweep_x(self, rect, x):
+    return self.sweep(rect.x, x, rect.width, self.span(rect.top, rect.bottom, self.solid.shape[0]), self.solid)
+
+  """
+    Moves the rect vertically to y, returns the y where it stops
+  """
+  def sweep_y(self, rect, y):
+    return self.sweep(rect.y, y, rect.height, self.span(rect.left, rect.right, self.solid.shape[1]), self.solid.T)
+
+  """
+    Sweeps a segment of the given length from start to end along the columns of solid,
+    covering the rows in lanes. Returns where the segment stops
+  """
+  def sweep(self, start, end, length, lanes, solid):
+    first_lane, last_lane = lanes
+    size = self.tile_size
+    if start == end or first_lane > last_lane:
+      return end
+    count = solid.shape[1]
+    if end > start:
+      # columns entered by the leading (right or bottom) edge
+      first, last = (start + length - 1) // size + 1, (end + length - 1) // size
+      first, last = max(first, 0), min(last, count - 1)
+      if first > last:
+        return end
+      blocked = solid[first_lane:last_lane + 1, first:last + 1].any(axis=0)
+      if blocked.any():
+        # stop right before the nearest solid column
+        return (first + int(blocked.argmax())) * size - length
+    else:
+      # columns entered by the leading (left or top) edge
+      first, last = end // size, start // size - 1
+      first, last = max(first, 0), min(last, count - 1)
+      if first > last:
+        return end
+      blocked = solid[first_lane:last_lane + 1, first:last + 1].any(axis=0)
+      if blocked.any():
+        # stop right after the nearest solid column
+        return (last - int(blocked[::-1].argmax()) + 1) * size
+    return end
+
+  """
+    Returns the goals on the tiles the rect covers
+  """
+  def goals_at(self, rect):
+    first_row, last_row = self.span(rect.top, rect.bottom, self.goal_tiles.shape[0])
+    first_col, last_col = self.span(rect.left, rect.right, self.goal_tiles.shape[1])
+    if first_row > last_row or first_col > last_col:
+      return []
+    cells = self.goal_tiles[first_row:last_row + 1, first_col:last_col + 1]
+    if not cells.any():
+      return []
+    # goals of views not built yet are skipped
+    goals = [self.goals.get((first_row + int(row), first_col + int(col))) for row, col in np.argwhere(cells)]
+    return [goal for goal in goals if goal is not None]
@@ -0,0 +1,132 @@
+from concurrent.futures import ThreadPoolExecutor
+
+"""
+  Everything the game keeps for a view that is in memory: its sprite group,
+  its spatial index (or tile collider) and the goals still drawn.
+"""
+class WorldView():
+  def __init__(self, entities, index, goals, collider=None):
+    # platforms and goals of the view
+    self.entities = entities
+    # spatial index of the entities, used for collisions
+    self.index = index
+    # goals drawn, goals are removed from it when their collected animation ends
+    self.goals = goals
+    # tile grid of the view, used by the "grid" collision backend
+    self.collider = collider
+
+"""
+  Keeps the views of the world in memory. With a window, only the views up to window views away
+  from the current one are kept, the others are built again when needed. Views can be built ahead
+  of time on a background thread (prefetch), so moving to them does not stall the game.
+  The goals collected are remembered per view, so a view built again keeps them collected.
+"""
+class WorldStreamer():
+  def __init__(self, views, build, window=None, on_evict=None):
+    # number of views in the world
+    self.views = views
+    # build(view, collected) returns the WorldView of a view, collected is the centers of its collected goals
+    self.build = build
+    # how many views away from the current one are kept, None keeps every view
+    self.window = window
+    # called with the view when a view is removed from memory
+    self.on_evict = on_evict
+    # view -> WorldView of the views in memory
+    self.resident = {}
+    # view -> Future of the views being built in the background
+    self.pending = {}
+    # view -> centers of the goals collected in that view
+    self.collected = {}
+    # thread used to build the views ahead of time, created when first needed
+    self.executor = None
+
+  def __len__(self):
+    return self.views
+
+  """
+    Returns the WorldView of a view, building it if it is not in memory
+  """
+  def get(self, view):
+    world_view = self.resident.get(view)
+    if world_view is None:
+      future = self.pending.pop(view, None)
+      if future is not None:
+        # wait for the background thread if it is still building it
+        world_view = future.result()
+      else:
+        world_view = self.build(view, set(self.collected.get(view, ())))
+      self.resident[view] = world_view
+    return world_view
+
+  """
+    Returns the WorldView of a view if it is in memory, None otherwise
+  """
+  def peek(self, view):
+    return self.resident.get(view)
+
+  """
+    Starts building a view on the background thread, if it is not already in memory or being built
+  """
+  def prefetch(self, view):
+    if view < 0 or view >= self.views or view in self.resident or view in self.pending:
+      return
+    if self.executor is None:
+      self.executor = ThreadPoolExecutor(max_workers=1)
+    self.pending[view] = self.executor.submit(self.build, view, set(self.collected.get(view, ())))
+
+  """
+    Called when the current view changes. Makes sure the view is in memory, removes the views
+    outside the window, and prefetches the neighbours of the view
+  """
+  def focus(self, view):
+    self.get(view)
+    if self.window is None:
+      return
+    for other in [other for other in self.resident if abs(other - view) > self.window]:
+      self.evict(other)
+    # views being built that are no longer needed
+    for other in [other for other in self.pending if abs(other - view) > self.window]:
+      self.pending.pop(other).cancel()
+    if self.window >= 1:
+      self.prefetch(view - 1)
+      self.prefetch(view + 1)
+
+  """
+    Removes a view from memory
+  """
+  def evict(self, view):
+    del self.resident[view]
+    if self.on_evict is not None:
+      self.on_evict(view)
+
+  """
+    Builds every view of the world
+  """
+  def build_all(self):
+    for view in range(self.views):
+      self.get(view)
+
+  """
+    Remembers that a goal of a view was collected
+  """
+  def mark_collected(self, view, goal):
+    self.collected.setdefault(view, set()).add(goal.rect.center)
+
+  """
+    Replaces the goals remembered as collected (e.g. when restoring a snapshot),
+    views being built with the previous ones are dropped
+  """
+  def restore_collected(self, collected):
+    self.collected = {view: set(centers) for view, centers in collected.items()}
+    for future in self.pending.values():
+      future.cancel()
+    self.pending.clear()
+
+  """
+    Stops the background thread, views being built are dropped
+  """
+  def shutdown(self):
+    if self.executor is not None:
+      self.executor.shutdown(wait=False, cancel_futures=True)
+      self.executor = None
+    self.pending.clear()
@@ -1,4 +1,23 @@
 from .Goal import *
 from .Platform import *
 from .Player import *
-from .Spritesheet import *
\ No newline at end of file
+from .Spritesheet import *
+from .StaticLayer import *
+from .DirtyRenderer import *
+from .TextCache import *
+from .AssetManager import *
+from .MapLoader import *
+from .ScriptedKeys import *
+from .Profiler import *
+from .RenderPipeline import *
+from .WorldStreamer import *
+from .TileCollider import *
+from .Replay import *
+from .AnimationClock import *
+from .TextureAtlas import *
+from .AssetCache import *
+from .Camera import *
+from .EntityStore import *
+from .InputActions import *
+from .Snapshot import *
+from .FramePacer import *
\ No newline at end of file
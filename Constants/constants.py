@@ -2,4 +2,49 @@ FPS = 60
 
 JUMP_VELOCITY = 420
 FALL_VELOCITY = 10
-RUN_VELOCITY = 200
\ No newline at end of file
+RUN_VELOCITY = 200
+
+# only repaint the parts of the screen that changed, instead of the whole screen every frame
+DIRTY_RENDERING = False
+
+# world loaded by the game, compiled from Maps/World1.dat with compile_map.py
+WORLD_MAP = "Maps/World1.map"
+
+# physics steps per second, the simulation does not depend on the frame rate
+PHYSICS_HZ = 120
+# the most time (in seconds) simulated for a single frame, longer frames slow the game down instead
+MAX_FRAME_TIME = 0.25
+
+# time the phases of each frame (see Components/Profiler.py)
+PROFILING = False
+# draw a graph of the frame timings on top of the game, turns on PROFILING
+PROFILER_OVERLAY = False
+
+# how many views away from the current one are kept in memory, None builds and keeps every view
+STREAMING_WINDOW = None
+# distance (in pixels) from the edge of the screen at which the next view starts being built
+PREFETCH_DISTANCE = 192
+
+# how the player collides with the world: "index" tests the sprites near the player,
+# "grid" sweeps the player against the tile grid of the view (needs numpy)
+COLLISION_BACKEND = "index"
+
+# size (in pixels) of the square pages of the texture atlas the frames of the sprite sheets are packed in
+ATLAS_PAGE_SIZE = 512
+# "views" shows the world one screen (view) at a time, "scroll" places the views side by side
+# and scrolls the camera with the player
+CAMERA = "views"
+
+# font file of the texts, None is the font bundled with pygame (loaded directly, without looking for system fonts)
+FONT = None
+FONT_SIZE = 30
+# load what is not needed to draw the first frame (other views, collected animation, asset cache) after it
+DEFER_LOADING = True
+
+# frames per second of the main loop on the end screens and when the window is not focused
+IDLE_FPS = 10
+# wait for the next frame with a busy loop, more precise timing but a core is used while waiting
+BUSY_LOOP = False
+
+# file the processed images are cached in, None always processes the sprite sheets at start
+ASSET_CACHE = "Assets/processed.cache"
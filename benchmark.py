@@ -0,0 +1,166 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import pygame as pg
+from state import State
+from Components import AssetManager, MapLoader, ScriptedKeys, TileMap
+from Constants import *
+from Enums import Platforms
+
+"""
+    Runs the game headless for a number of frames, with scripted input and no FPS cap,
+    and reports how fast the simulation and the rendering go.
+    usage: python benchmark.py [--frames N] [--views N ...] [--output results.json]
+"""
+
+"""
+    Returns the keys pressed on each frame: mostly running right, sometimes left, jumping on and off.
+    Seeded, so every run (and every build) gets the same input.
+"""
+def scripted_input(frames, seed=0):
+    rng = random.Random(seed)
+    keys = []
+    for frame in range(frames):
+        # hold the same keys for 20 frames
+        if frame % 20 == 0:
+            pressed = []
+            if rng.random() < 0.2:
+                pressed.append(pg.K_a)
+            if rng.random() < 0.7:
+                pressed.append(pg.K_d)
+            if rng.random() < 0.5:
+                pressed.append(pg.K_SPACE)
+            current = ScriptedKeys(pressed)
+        keys.append(current)
+    return keys
+
+"""
+    Writes a world with the given amount of views into path: solid ground with a few holes,
+    floating platforms and a goal per view. The ground is the bottom row, as in Maps/World1.dat,
+    so the player does not start inside it
+"""
+def synthetic_world(path, views, seed=0):
+    rng = random.Random(seed)
+    rows, cols = 12, 20
+    tiles = bytearray([MapLoader.TILE_EMPTY]) * (views * rows * cols)
+    def set_tile(view, row, col, tile):
+        tiles[(view * rows + row) * cols + col] = tile
+    for view in range(views):
+        for col in range(cols):
+            # leave a hole now and then, never at the start of the world
+            if view > 0 and rng.random() < 0.05:
+                continue
+            set_tile(view, rows - 1, col, Platforms.GROUND_GRASS_CENTER.value)
+        # floating platforms
+        for _ in range(rng.randint(3, 8)):
+            row, col = rng.randint(2, rows - 4), rng.randint(1, cols - 4)
+            set_tile(view, row, col, Platforms.GROUND_GRASS_LEFT.value)
+            set_tile(view, row, col + 1, Platforms.GROUND_GRASS_CENTER.value)
+            set_tile(view, row, col + 2, Platforms.GROUN_GRASS_RIGHT.value)
+        set_tile(view, rng.randint(2, rows - 4), rng.randint(1, cols - 2), MapLoader.TILE_GOAL)
+    MapLoader.save(TileMap(views, rows, cols, bytes(tiles)), path)
+
+"""
+    Returns the value at the given percentile of a sorted list
+"""
+def percentile(values, percent):
+    index = min(len(values) - 1, int(round(percent / 100 * (len(values) - 1))))
+    return values[index]
+
+"""
+    Summary (in milliseconds) of a list of durations in seconds
+"""
+def summarize(durations):
+    values = sorted(duration * 1000 for duration in durations)
+    return {
+        "mean_ms": sum(values) / len(values),
+        "p50_ms": percentile(values, 50),
+        "p99_ms": percentile(values, 99),
+        "max_ms": values[-1],
+    }
+
+"""
+    Runs the game on a world for a number of frames and returns the measurements
+"""
+def run(state, world, frames, draw=True):
+    state.world = world
+    load_start = time.perf_counter()
+    state.restart()
+    load_time = time.perf_counter() - load_start
+    atlas = AssetManager.atlas_report()
+    phases = {"events": [], "update": [], "draw": []}
+    totals = []
+    draw_calls = 0
+    blit_count = 0
+    dt = 1 / FPS
+    for keys in scripted_input(frames):
+        start = time.perf_counter()
+        state.dt = dt
+        state.events_handler(keys)
+        after_events = time.perf_counter()
+        state.update()
+        after_update = time.perf_counter()
+        if draw:
+            state.draw()
+        end = time.perf_counter()
+        draw_calls += state.pipeline.draw_calls
+        blit_count += state.pipeline.blit_count
+        phases["events"].append(after_events - start)
+        phases["update"].append(after_update - after_events)
+        phases["draw"].append(end - after_update)
+        totals.append(end - start)
+    return {
+        "world": world,
+        "views": state.MAX_VIEW + 1,
+        "frames": frames,
+        "draw": draw,
+        "load_ms": load_time * 1000,
+        "fps": frames / sum(totals),
+        "frame": summarize(totals),
+        "phases": {name: summarize(durations) for name, durations in phases.items()},
+        # per frame, only counted when the whole screen is drawn (not with --dirty)
+        "draw_calls": draw_calls / frames,
+        "blits": blit_count / frames,
+        "resident_views": len(state.streamer.resident),
+        # pages of the texture atlas, how full they are and the memory of the images
+        "atlas_pages": len(atlas["pages"]),
+        "atlas_occupancy": atlas["occupancy"],
+        "atlas_saved_bytes": atlas["saved_bytes"],
+        "image_bytes": AssetManager.memory_usage(),
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Headless frame time benchmark")
+    parser.add_argument("--frames", type=int, default=2000, help="frames to run per world")
+    parser.add_argument("--views", type=int, nargs="*", default=[50, 500], help="sizes of the synthetic worlds")
+    parser.add_argument("--no-draw", action="store_true", help="only run the simulation")
+    parser.add_argument("--dirty", action="store_true", help="use the dirty rectangle renderer")
+    parser.add_argument("--collision", default=COLLISION_BACKEND, choices=["index", "grid"], help="collision backend")
+    parser.add_argument("--camera", default=CAMERA, choices=["views", "scroll"], help="one view at a time or a scrolling camera")
+    parser.add_argument("--window", type=int, help="only keep the views up to this many views away from the current one")
+    parser.add_argument("--output", help="write the results as JSON to this file instead of stdout")
+    parser.add_argument("--trace", help="write the profiler timings of the last frames as a Chrome trace to this file")
+    parser.add_argument("--csv", help="write the profiler timings of the last frames as CSV to this file")
+    args = parser.parse_args()
+
+    state = State(dirty_rendering=args.dirty, headless=True, profiling=bool(args.trace or args.csv), streaming_window=args.window, collision_backend=args.collision, camera=args.camera, defer_loading=False)
+    results = [run(state, WORLD_MAP, args.frames, not args.no_draw)]
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as directory:
+        for views in args.views:
+            world = os.path.join(directory, f"synthetic_{views}.map")
+            synthetic_world(world, views)
+            results.append(run(state, world, args.frames, not args.no_draw))
+    report = json.dumps({"results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(report)
+    else:
+        print(report)
+    if args.trace:
+        state.profiler.export_chrome_trace(args.trace)
+    if args.csv:
+        state.profiler.export_csv(args.csv)
+    pg.quit()
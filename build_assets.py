@@ -0,0 +1,26 @@
+import os
+import sys
+import pygame as pg
+from Components import AssetCache, AssetManager, Goal, Platform, Player
+from Constants import *
+
+"""
+    Processes every sprite sheet of the game and writes the result to the asset cache,
+    so the first start of the game does not have to. The game also does it on its own when
+    the cache is missing or out of date.
+    usage: python build_assets.py [cache file]
+"""
+if __name__ == '__main__':
+    path = sys.argv[1] if len(sys.argv) > 1 else ASSET_CACHE
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    pg.display.init()
+    # converting the images needs a display mode
+    pg.display.set_mode((1, 1))
+    Player()
+    Platform.init_surfaces_per_type()
+    Goal.init_surfaces_per_type()
+    Goal.init_collected_animation()
+    AssetCache.save(path)
+    report = AssetManager.atlas_report()
+    print(f"{path}: {report['frames']} frames in {len(report['pages'])} pages ({report['occupancy']:.0%} used), {os.path.getsize(path)} bytes")
+    print(f"atlas: {report['bytes']} bytes for {report['frame_bytes']} bytes of frames, {report['saved_bytes']} bytes less than whole pages")
@@ -0,0 +1,18 @@
+import sys
+from Components.MapLoader import MapLoader
+
+"""
+    Compiles a world from the text format (.dat) into the binary format (.map) loaded by the game.
+    usage: python compile_map.py Maps/World1.dat [Maps/World1.map]
+"""
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("usage: python compile_map.py <world.dat> [world.map]")
+        sys.exit(1)
+    source = sys.argv[1]
+    destination = sys.argv[2] if len(sys.argv) > 2 else source.rsplit('.', 1)[0] + '.map'
+    tile_map = MapLoader.compile(source, destination)
+    print(f"{destination}: {tile_map.views} views of {tile_map.rows}x{tile_map.cols} tiles")
+    for view in range(tile_map.views):
+        platforms = sum(1 for row, col, tile in tile_map.view_tiles(view) if tile < MapLoader.TILE_GOAL)
+        print(f"  view {view}: {platforms} platforms merged into {len(tile_map.view_colliders(view))} collision rectangles")
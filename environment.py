@@ -0,0 +1,209 @@
+import multiprocessing as mp
+import numpy as np
+import pygame as pg
+from state import State
+from Constants import *
+from Enums import Direction
+
+"""
+  The game as an environment for automated agents: reset() starts a new game, step(action) plays
+  frames with the action held and returns (observation, reward, terminated, truncated, info).
+  Runs headless, drawing is only done when render is True.
+
+  Actions:      0 nothing, 1 left, 2 right, 3 jump, 4 left and jump, 5 right and jump
+  Observations: float32 array with OBSERVATION_FIELDS
+  Rewards:      +1 for each goal collected, -1 when the player dies
+  Terminated:   the player died or every goal was collected
+  Truncated:    max_steps steps were played
+"""
+class PlatformerEnv():
+  # (direction, jump) of each action
+  ACTIONS = [
+    (None, False),
+    (Direction.LEFT, False),
+    (Direction.RIGHT, False),
+    (None, True),
+    (Direction.LEFT, True),
+    (Direction.RIGHT, True),
+  ]
+  OBSERVATION_FIELDS = [
+    "x", "y",                   # top left of the player in the view, in pixels
+    "velocity_x", "velocity_y", # in pixels per second
+    "on_floor",                 # 1 if the player is on a platform
+    "view",                     # current view
+    "collected",                # goals collected
+    "goal_dx", "goal_dy",       # distance from the player to the goal of the view, 0 if there is none
+    "has_goal",                 # 1 if the view has a goal left to collect
+  ]
+
+  def __init__(self, world=WORLD_MAP, frame_skip=1, max_steps=3600, render=False, **state_options):
+    # the game, without a window
+    self.state = State(headless=True, world=world, **state_options)
+    # frames played per step, with the same action
+    self.frame_skip = frame_skip
+    # steps played before the episode is truncated
+    self.max_steps = max_steps
+    # draw the game on every frame
+    self.render_frames = render
+    # steps played in this episode
+    self.steps = 0
+    # number of possible actions and size of the observations
+    self.action_count = len(PlatformerEnv.ACTIONS)
+    self.observation_size = len(PlatformerEnv.OBSERVATION_FIELDS)
+
+  """
+    Starts a new game, returns (observation, info)
+  """
+  def reset(self, seed=None):
+    # the game has no randomness, seed is only accepted for compatibility
+    self.state.restart()
+    self.steps = 0
+    return self.observe(), {}
+
+  """
+    Plays frame_skip frames holding the action, returns (observation, reward, terminated, truncated, info)
+  """
+  def step(self, action):
+    state = self.state
+    player = state.player
+    direction, jump = PlatformerEnv.ACTIONS[int(action)]
+    collected = state.num_collected
+    was_dead = state.player_dead
+    for _ in range(self.frame_skip):
+      # same as the keys handled by State.events_handler
+      if direction is None:
+        player.stop()
+      else:
+        player.event_direction(direction)
+      if jump:
+        player.event_jump()
+      else:
+        player.set_jumped(False)
+      state.dt = 1 / FPS
+      state.update()
+      if self.render_frames:
+        state.draw()
+      if state.player_dead or state.completed:
+        break
+    self.steps += 1
+    reward = float(state.num_collected - collected)
+    if state.player_dead and not was_dead:
+      reward -= 1.0
+    terminated = state.player_dead or state.completed
+    truncated = not terminated and self.steps >= self.max_steps
+    info = {"view": state.view, "collected": state.num_collected, "dead": state.player_dead, "completed": state.completed}
+    return self.observe(), reward, terminated, truncated, info
+
+  """
+    Returns the observation of the current state of the game
+  """
+  def observe(self):
+    state = self.state
+    player = state.player
+    observation = np.zeros(self.observation_size, dtype=np.float32)
+    observation[0:7] = (player.position.x, player.position.y, player.velocity.x, player.velocity.y,
+                        player.on_floor, state.view, state.num_collected)
+    for goal in state.streamer.get(state.view).goals:
+      if not goal.collected:
+        observation[7:10] = (goal.rect.centerx - player.rect.centerx, goal.rect.centery - player.rect.centery, 1)
+        break
+    return observation
+
+  """
+    Returns the screen as a (width, height, 3) array, drawing the current frame
+  """
+  def render(self):
+    self.state.draw()
+    return pg.surfarray.array3d(self.state.screen)
+
+  def close(self):
+    self.state.streamer.shutdown()
+
+"""
+  Runs in each process of a VectorEnv, steps its environments when asked to through the connection
+"""
+def vector_worker(connection, count, options):
+  envs = [PlatformerEnv(**options) for _ in range(count)]
+  size = envs[0].observation_size
+  try:
+    while True:
+      command, data = connection.recv()
+      if command == "reset":
+        connection.send(np.stack([env.reset()[0] for env in envs]))
+      elif command == "step":
+        observations = np.empty((count, size), dtype=np.float32)
+        rewards = np.empty(count, dtype=np.float32)
+        terminated = np.empty(count, dtype=bool)
+        truncated = np.empty(count, dtype=bool)
+        for index, (env, action) in enumerate(zip(envs, data)):
+          observation, rewards[index], terminated[index], truncated[index], _ = env.step(action)
+          # finished episodes start over right away
+          if terminated[index] or truncated[index]:
+            observation, _ = env.reset()
+          observations[index] = observation
+        connection.send((observations, rewards, terminated, truncated))
+      elif command == "close":
+        break
+  finally:
+    for env in envs:
+      env.close()
+    connection.close()
+
+"""
+  Many PlatformerEnv stepped in lockstep, spread over a pool of processes.
+  step(actions) takes one action per environment and returns batched NumPy arrays:
+  observations (num_envs, observation size), rewards, terminated and truncated (num_envs,).
+  Environments that finish are reset automatically, the observation returned is the new episode's.
+"""
+class VectorEnv():
+  def __init__(self, num_envs, num_workers=None, **options):
+    self.num_envs = num_envs
+    num_workers = min(num_workers or mp.cpu_count(), num_envs)
+    # split the environments as evenly as possible between the workers
+    counts = [num_envs // num_workers + (1 if worker < num_envs % num_workers else 0) for worker in range(num_workers)]
+    self.slices = []
+    start = 0
+    for count in counts:
+      self.slices.append(slice(start, start + count))
+      start += count
+    # pygame is not safe to fork, so the workers are started fresh
+    context = mp.get_context("spawn")
+    self.connections = []
+    self.processes = []
+    for count in counts:
+      connection, worker_connection = context.Pipe()
+      process = context.Process(target=vector_worker, args=(worker_connection, count, options), daemon=True)
+      process.start()
+      worker_connection.close()
+      self.connections.append(connection)
+      self.processes.append(process)
+
+  """
+    Starts a new game in every environment, returns the observations
+  """
+  def reset(self):
+    for connection in self.connections:
+      connection.send(("reset", None))
+    return np.concatenate([connection.recv() for connection in self.connections])
+
+  """
+    Steps every environment with its action, returns (observations, rewards, terminated, truncated)
+  """
+  def step(self, actions):
+    actions = np.asarray(actions)
+    for connection, part in zip(self.connections, self.slices):
+      connection.send(("step", actions[part]))
+    results = [connection.recv() for connection in self.connections]
+    return tuple(np.concatenate(arrays) for arrays in zip(*results))
+
+  """
+    Stops the worker processes
+  """
+  def close(self):
+    for connection in self.connections:
+      try:
+        connection.send(("close", None))
+      except (BrokenPipeError, EOFError):
+        pass
+    for process in self.processes:
+      process.join()
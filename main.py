@@ -1,10 +1,37 @@
 # Example file showing a circle moving on screen
+import argparse
+import os
+import sys
 import pygame as pg
 from state import State
 
 """
     Runs the main loop of the game.
+    --record saves the keys pressed into a file that replay.py plays back
+    --checkpoint continues the game saved in the file, if it exists, and saves the game to it on reaching
+    the next view and when closed, unless the game is over or finished
+    they cannot be used together: a recording starts from a restarted game, which would drop the checkpoint
 """
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--record", help="record the session into this file")
+    parser.add_argument("--checkpoint", help="continue from and save to this checkpoint file")
+    args = parser.parse_args()
+    if args.record and args.checkpoint:
+        parser.error("--record restarts the game, it cannot continue from --checkpoint")
     gameState = State()
-    gameState.main_loop()
\ No newline at end of file
+    if args.checkpoint and os.path.exists(args.checkpoint):
+        try:
+            gameState.load_checkpoint(args.checkpoint)
+        except ValueError as error:
+            # e.g. saved in another world, the file is left as it is
+            pg.quit()
+            sys.exit(f"cannot continue from {args.checkpoint}: {error}")
+    # saved each time the player reaches the next view
+    gameState.checkpoint = args.checkpoint
+    if args.record:
+        gameState.start_recording(args.record)
+    gameState.main_loop()
+    # a game over or finished game would resume on its end screen, the last checkpoint is kept instead
+    if args.checkpoint and not gameState.player_dead and not gameState.completed:
+        gameState.save_checkpoint(args.checkpoint)
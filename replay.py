@@ -0,0 +1,44 @@
+import argparse
+import json
+import sys
+import pygame as pg
+from state import State
+from Components import InputReplayer
+from Constants import *
+
+"""
+    Replays recorded sessions (python main.py --record session.rec) headless and as fast as possible,
+    reports how fast they ran and fails if a replay did not behave exactly as when it was recorded.
+    usage: python replay.py session.rec [other.rec ...] [--collision grid] [--output results.json]
+"""
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replay recorded sessions")
+    parser.add_argument("recordings", nargs="+", help="recordings to replay")
+    parser.add_argument("--collision", default=COLLISION_BACKEND, choices=["index", "grid"], help="collision backend")
+    parser.add_argument("--draw", action="store_true", help="draw every tick")
+    parser.add_argument("--output", help="write the results as JSON to this file instead of stdout")
+    args = parser.parse_args()
+
+    results = []
+    for path in args.recordings:
+        replayer = InputReplayer(path)
+        state = State(headless=True, world=replayer.world, physics_hz=replayer.physics_hz, collision_backend=args.collision)
+        if args.draw:
+            # draw after each update, without changing the replay itself
+            update = state.update
+            def update_and_draw(update=update, state=state):
+                update()
+                state.draw()
+            state.update = update_and_draw
+        result = replayer.run(state)
+        result["recording"] = path
+        results.append(result)
+        state.streamer.shutdown()
+    report = json.dumps({"results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(report)
+    else:
+        print(report)
+    pg.quit()
+    sys.exit(0 if all(result["matches"] for result in results) else 1)
@@ -0,0 +1,73 @@
+import time
+START = time.perf_counter()
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import pygame as pg
+from state import State
+from Constants import *
+IMPORTED = time.perf_counter()
+
+"""
+    Measures how long the game takes to show its first frame, split into import (python modules
+    and pygame), init (pygame modules and window), assets (images and font), map (world and first view)
+    and first frame (events, update and draw). Every run is a new python process, so nothing is warm.
+    usage: python startup.py [--runs N] [--no-cache] [--window] [--output results.json]
+"""
+
+PHASES = ["import", "init", "assets", "map", "first_frame", "total"]
+
+"""
+    Starts the game, draws the first frame and returns the time of each phase in seconds
+"""
+def measure(asset_cache, headless):
+    state = State(headless=headless, asset_cache=asset_cache)
+    start = time.perf_counter()
+    state.events_handler()
+    state.update()
+    state.draw()
+    end = time.perf_counter()
+    times = {"import": IMPORTED - START}
+    times.update(state.startup_times)
+    times["first_frame"] = end - start
+    times["total"] = end - START
+    state.finish_loading()
+    state.streamer.shutdown()
+    pg.quit()
+    return times
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure the time to the first frame")
+    parser.add_argument("--runs", type=int, default=5, help="number of starts, the median is reported")
+    parser.add_argument("--no-cache", action="store_true", help="start without the asset cache")
+    parser.add_argument("--window", action="store_true", help="open a real window instead of drawing in memory")
+    parser.add_argument("--output", help="write the results as JSON to this file instead of stdout")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # a single start, reported to the parent process on the last line
+        print(json.dumps(measure(None if args.no_cache else ASSET_CACHE, not args.window)))
+        sys.exit(0)
+
+    command = [sys.executable, os.path.abspath(__file__), "--child"]
+    if args.no_cache:
+        command.append("--no-cache")
+    if args.window:
+        command.append("--window")
+    runs = []
+    for run in range(args.runs):
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    median = {phase: statistics.median(run[phase] for run in runs) for phase in PHASES}
+    report = json.dumps({"runs": runs, "median": median}, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(report)
+    else:
+        print(report)
+    for phase in PHASES:
+        print(f"{phase:>12}: {median[phase] * 1000:8.1f} ms", file=sys.stderr)
@@ -1,5 +1,9 @@
 # acts as the current state of the game, connects
 # the player, and other entities and pygame
+import math
+import os
+import time
+from functools import partial
 import pygame as pg
 from Components import *
 from Constants import *
@@ -9,24 +13,65 @@ from Enums import *
   Contains the state of the game, the player, the blocks, and the goals for the game.
 """
 class State():
-  def __init__(self):
-    pg.init()
+  def __init__(self, dirty_rendering=DIRTY_RENDERING, headless=False, world=WORLD_MAP, physics_hz=PHYSICS_HZ,
+               profiling=PROFILING, profiler_overlay=PROFILER_OVERLAY, streaming_window=STREAMING_WINDOW,
+               collision_backend=COLLISION_BACKEND, asset_cache=ASSET_CACHE, camera=CAMERA,
+               idle_fps=IDLE_FPS, busy_loop=BUSY_LOOP, defer_loading=DEFER_LOADING):
+    # seconds spent on each phase of the start (init, assets, map), see startup.py
+    self.startup_times = {}
+    start = time.perf_counter()
+    # without a window, the screen is only drawn in memory
+    if headless:
+      os.environ["SDL_VIDEODRIVER"] = "dummy"
+    # only the modules the game uses, pg.init would also start the audio and the joysticks
+    pg.display.init()
+    pg.font.init()
     # intialize the screen with 1280x768 resolution
     self.screen = pg.display.set_mode((1280, 768))
+    self.startup_times["init"] = time.perf_counter() - start
+    start = time.perf_counter()
+    # read the processed images from the asset cache, so the sprite sheets are not decoded nor scaled again
+    self.asset_cache = asset_cache
+    if asset_cache is not None:
+      AssetCache.load(asset_cache)
     # initialize the player class
     self.player = Player()
     # initialize the static data members used for Platform and Goal
     Platform.init_surfaces_per_type()
     Goal.init_surfaces_per_type()
-    Goal.init_collected_animation()
-    # generate the entities per "view"
-    self.entities_per_view = self.generate_entities()
+    # set the font used for the game
+    self.font = pg.font.Font(FONT, FONT_SIZE)
+    # what is loaded after the first frame is drawn, see finish_loading; everything is loaded right away when False
+    self.defer_loading = defer_loading
+    self.deferred = [self.load_remaining_assets]
+    self.startup_times["assets"] = time.perf_counter() - start
+    start = time.perf_counter()
+    # plays the looping animations shared by many sprites, the idle animation of the goals
+    self.animations = AnimationClock()
+    Goal.add_animations(self.animations)
+    # path of the map file of the world
+    self.world = world
+    # how many views away from the current one are kept in memory, None keeps every view
+    # the scrolling camera can show two views at once, so it keeps at least the views next to the current one
+    self.streaming_window = streaming_window if camera != "scroll" or streaming_window is None else max(streaming_window, 1)
+    # the camera following the player in the "scroll" mode, made with the world; None shows one view at a time
+    self.camera = None
+    self.scrolling = camera == "scroll"
+    # chunks seen by the camera the last time the layers were set
+    self.visible_chunks = None
+    # "index" collides against the sprites near the player, "grid" against the tile grid of the view
+    self.collision_backend = collision_backend
+    # pre-rendered background (colour and platforms) per "view"
+    self.static_layer = StaticLayer(self.screen.get_size(), "cornflowerblue")
     # current view of the game
     self.view = 0
+    # the entities, spatial index and goals per "view", built as they are needed
+    self.streamer = self.load_world()
     # number of goals collected
     self.num_collected = 0
     # max view possible for this world
-    self.MAX_VIEW = len(self.entities_per_view) - 1
+    self.MAX_VIEW = len(self.streamer) - 1
+    self.startup_times["map"] = time.perf_counter() - start
 
     # is pygame running?
     self.running = True
@@ -36,162 +81,452 @@ class State():
     self.player_dead = False
     # the delta time for each frame tick
     self.dt = 0
+    # duration of a physics step, the simulation always advances by this amount
+    self.physics_step = 1 / physics_hz
+    # time not simulated yet, carried to the next frame
+    self.accumulator = 0
+    # how far the time is between the last two physics steps, used to draw the player
+    self.alpha = 0
     # initialze the clock for the game
     self.clock = pg.time.Clock()
-    # set the font used for the game
-    self.font = pg.font.SysFont('Comic Sans MS', 30)
+    # rendered texts, so the same text is not rendered every frame
+    self.text_cache = TextCache()
+    # position of the texts on the screen
+    self.hud = self.build_hud()
+    # if the texts shown changed since the last frame
+    self.hud_changed = True
+    # goals playing their collected animation, as (view, goal)
+    self.collecting = []
+    # what is drawn on each frame, by layer
+    self.pipeline = RenderPipeline([
+      RenderLayer("background"),
+      RenderLayer("player", "draw_rect"),
+      RenderLayer("collectibles"),
+      RenderLayer("hud"),
+      RenderLayer("overlay"),
+    ])
+    self.refresh_layers()
+    # renderer that only repaints what changed, None when the whole screen is drawn every frame
+    # the scrolling camera moves everything on the screen, so it is always drawn whole
+    self.renderer = DirtyRenderer(self.screen) if dirty_rendering and not self.scrolling else None
+    # times the phases of each frame, None when not profiling so it costs nothing
+    self.profiler = Profiler() if profiling or profiler_overlay else None
+    # draw the timings of the last frames on top of the game
+    self.profiler_overlay = profiler_overlay
+    # records the keys pressed on each tick, None when not recording (see start_recording)
+    self.recorder = None
+    # checkpoint file saved each time the player reaches the next view, None saves no checkpoint
+    self.checkpoint = None
+    # the actions of the keys (left, right, jump, restart), held, pressed and released on each frame
+    self.actions = InputActions()
+    # skips drawing the frames that look like the last one and slows down when the game is idle
+    self.pacer = FramePacer(idle_fps, busy_loop)
+    # the game as it starts, restart goes back to it without building anything again
+    self.start_snapshot = Snapshot.capture(self)
+    if not defer_loading:
+      self.finish_loading()
 
 
   """
     Main loop for the game, 
       - calls the events handler, 
       - calls the updates function
-      - calls the draw function 
+      - calls the draw function, when the frame does not look the same as the last one
       PER FPS TICK
+    fps of 0 runs the loop as fast as possible, the end screens and an unfocused window run at IDLE_FPS
   """
-  def main_loop(self):
+  def main_loop(self, fps=FPS):
     while self.running:
       self.events_handler()
       self.update()
-      self.draw()
+      if self.pacer.should_draw(self):
+        self.draw()
+      # the rest is loaded once the first frame is on the screen
+      if self.deferred:
+        self.finish_loading()
       # limits FPS to 60
       # dt is delta time in seconds since last frame, used for framerate-
       # independent physics.
-      self.dt = self.clock.tick(FPS) / 1000
+      self.dt = self.pacer.tick(self.clock, fps, self)
+    if self.recorder is not None:
+      self.recorder.save()
     pg.quit()
+
+  """
+    Loads what was left for after the first frame: the other views of the world, the collected
+    animation of the goals, and saves the images missing from the asset cache
+  """
+  def finish_loading(self):
+    deferred, self.deferred = self.deferred, []
+    for load in deferred:
+      load()
+
+  """
+    Loads the images not needed for the first frame, then saves the asset cache if images were missing from it
+  """
+  def load_remaining_assets(self):
+    if not Goal.collected_surfaces:
+      Goal.init_collected_animation()
+    # images missing from the asset cache were made, save them for the next start
+    if self.asset_cache is not None and AssetManager.changed:
+      AssetCache.save(self.asset_cache)
+
+  """
+    Restarts the game and records the keys pressed from now on into path, saved when the game is closed
+  """
+  def start_recording(self, path):
+    self.recorder = InputRecorder(path)
+    self.recorder.start(self)
+
+  """
+    Runs a single frame with a fixed delta time, without waiting for the clock.
+    keys is the state of the keys for this frame (e.g. ScriptedKeys), used to run the game
+    without real input; draw can be turned off to only run the simulation
+  """
+  def step(self, keys=None, dt=1 / FPS, draw=True):
+    self.dt = dt
+    self.events_handler(keys)
+    self.update()
+    if draw:
+      self.draw()
     
   """
-    The main draw function for the game, fills the screen with the background,
-    calls the draw function for each entity, and the draw function for the player
+    The main draw function for the game, draws the layers of the render pipeline:
+    the pre-rendered background of the view, then the player and the goals on top of it
     Also draws the text when the game is completed or when the player is dead
   """
   def draw(self):
-    # fill the screen with a color to wipe away anything from last frame
-    self.screen.fill("cornflowerblue")
-    # draw the player
-    self.screen.blit(self.player.surf, self.player.rect)
-    # draw the blocks and the goals
-    for entity in self.entities_per_view[self.view]:
-       if not isinstance(entity, Goal) or not entity.end:
-        self.screen.blit(entity.surf, entity.rect)
+    profiler = self.profiler
+    if profiler is not None:
+      profiler.start("draw.text")
+    # texts are only rendered again when they change
+    if self.hud_changed:
+      self.refresh_hud()
+    if profiler is not None:
+      # graph of the last frames on the top right corner
+      if self.profiler_overlay:
+        overlay = profiler.render_overlay()
+        self.pipeline.layer("overlay").set_items([("profiler", overlay, overlay.get_rect(topright=(self.screen.get_width() - 20, 20)))])
+      profiler.stop("draw.text")
+      profiler.start("draw.blits")
+    # only repaint what changed since the last frame
+    if self.renderer is not None:
+      self.renderer.render(self.static_layer.get(self.view), self.pipeline.drawables(exclude=("background",)), self.view)
+      if profiler is not None:
+        profiler.stop("draw.blits")
+      return
+    # draw the background, the blocks, the player, the goals and the texts, a blits call per layer
+    self.pipeline.render(self.screen)
+    if profiler is not None:
+      profiler.stop("draw.blits")
+      profiler.start("draw.flip")
+    # display the blitted surfaces
+    pg.display.flip()
+    if profiler is not None:
+      profiler.stop("draw.flip")
+
+  """
+    Points the layers of the render pipeline to the current view and player,
+    called when either changes
+  """
+  def refresh_layers(self):
+    if self.camera is not None:
+      self.pipeline.layer("player").set_sprites([self.player])
+      self.visible_chunks = None
+      self.update_camera()
+      return
+    world_view = self.streamer.get(self.view)
+    self.static_layer.set_view(self.view, world_view.entities)
+    self.pipeline.layer("background").set_items([("background", self.static_layer.get(self.view), (0, 0))])
+    self.pipeline.layer("player").set_sprites([self.player])
+    # the list is kept by the layer, goals removed from it are no longer drawn
+    self.pipeline.layer("collectibles").set_sprites(world_view.goals)
+
+  """
+    Moves the camera to the player and points the layers to the chunks it sees: their baked surfaces
+    and their goals. Only the (at most two) visible chunks are drawn, however long the world is
+  """
+  def update_camera(self):
+    camera = self.camera
+    camera.follow(self.player.draw_rect)
+    chunks = camera.visible_chunks()
+    # the tiles of a chunk only have to be given to the static layer when it starts being seen
+    if chunks != self.visible_chunks:
+      for chunk in chunks:
+        self.static_layer.set_view(chunk, self.streamer.get(chunk).entities, (chunk * camera.chunk_width, 0))
+      self.visible_chunks = chunks
+    backgrounds = []
+    goals = []
+    for chunk in chunks:
+      backgrounds.append((("chunk", chunk), self.static_layer.get(chunk), camera.chunk_position(chunk)))
+      goals.extend(self.streamer.get(chunk).goals)
+    self.pipeline.layer("background").set_items(backgrounds)
+    self.pipeline.layer("collectibles").set_sprites(goals)
+    offset = camera.offset()
+    self.pipeline.layer("player").set_offset(offset)
+    self.pipeline.layer("collectibles").set_offset(offset)
+
+  """
+    Sets the texts shown, depending on if the game is completed or the player is dead
+  """
+  def refresh_hud(self):
+    items = []
     # if the game is completed
     if (self.completed):
-       game_finished_text = self.font.render("Game Finished!", True, (255, 255, 255))
-       # coordinate of the game finished text; half of screen - half of text length
-       gf_x = self.screen.get_width() / 2 - game_finished_text.get_rect().width / 2
-       # half of height
-       gf_y = self.screen.get_height() / 2 - game_finished_text.get_rect().height / 2
-       restart_text = self.font.render("Press R to restart", True, (255, 255, 255))
-       # coordinate of the restart message; below the game finished text
-       rt_x = self.screen.get_width() / 2 - restart_text.get_rect().width / 2
-       rt_y = self.screen.get_height() / 2 - restart_text.get_rect().height / 2 + game_finished_text.get_rect().height
-       # draw the text
-       self.screen.blit(game_finished_text, (gf_x, gf_y))
-       self.screen.blit(restart_text, (rt_x, rt_y))
-
+       items.extend(self.get_text_items(self.hud["finished"]))
     if (self.player_dead):
-       game_over_text = self.font.render("Game Over!", True, (255, 255, 255))
-       # coordinate of the game over text; which is at the half of screen - half of text length
-       go_x = self.screen.get_width() / 2 - game_over_text.get_rect().width / 2
-       # half of height
-       go_y = self.screen.get_height() / 2 - game_over_text.get_rect().height / 2
-       restart_text = self.font.render("Press R to restart", True, (255, 255, 255))
-       # coordinate of teh restart message; below the game over text
-       rt_x = self.screen.get_width() / 2 - restart_text.get_rect().width / 2
-       rt_y = self.screen.get_height() / 2 - restart_text.get_rect().height / 2 + game_over_text.get_rect().height
-       # draw the text
-       self.screen.blit(game_over_text, (go_x, go_y))
-       self.screen.blit(restart_text, (rt_x, rt_y))
+       items.extend(self.get_text_items(self.hud["game over"]))
     # display instructions
-    direction_text = self.font.render("Press a or d to move or space to jump.", True, (255, 255, 255))
-    self.screen.blit(direction_text, (20, 20))
-    # display the blitted surfaces
-    pg.display.flip()
+    items.extend(self.get_text_items(self.hud["instructions"]))
+    self.pipeline.layer("hud").set_items(items)
+    self.hud_changed = False
+
+  """
+    Returns (key, surface, rect) of a group of texts from the layout, the surfaces come from the text cache
+  """
+  def get_text_items(self, texts):
+    return [(key, self.text_cache.render(self.font, text, True, (255, 255, 255)), rect) for key, text, rect in texts]
+
+  """
+    Computes where the texts are placed on the screen, done once since the texts never change
+    Returns a dict of text groups, each a list of (key, text, rect)
+  """
+  def build_hud(self):
+    width, height = self.screen.get_size()
+    hud = {}
+    for group, title in (("finished", "Game Finished!"), ("game over", "Game Over!")):
+      title_width, title_height = self.font.size(title)
+      restart_width, restart_height = self.font.size("Press R to restart")
+      # coordinate of the title; half of screen - half of text length, half of height
+      title_x = width / 2 - title_width / 2
+      title_y = height / 2 - title_height / 2
+      # coordinate of the restart message; below the title
+      restart_x = width / 2 - restart_width / 2
+      restart_y = height / 2 - restart_height / 2 + title_height
+      hud[group] = [
+        (group, title, pg.Rect((title_x, title_y), (title_width, title_height))),
+        (group + " restart", "Press R to restart", pg.Rect((restart_x, restart_y), (restart_width, restart_height))),
+      ]
+    # instructions on the top left of the screen
+    instructions = "Press a or d to move or space to jump."
+    hud["instructions"] = [("instructions", instructions, pg.Rect((20, 20), self.font.size(instructions)))]
+    return hud
 
   """
     Calls the necessary update functions for animations, physics calculation of the main character
+    Platforms and idle goals are not updated: the looping animations are played by the animation clock,
+    only the goals playing their collected animation (self.collecting) and the player are updated
+    The physics runs in fixed steps, as many as fit in the time elapsed, so it behaves the same
+    at any frame rate; a stalled frame is capped to MAX_FRAME_TIME so it does not need too many steps
   """
   def update(self):
-    for entity in self.entities_per_view[self.view]:
-       entity.update()
-    self.player.update(self.dt, self)
+    profiler = self.profiler
+    view = self.view
+    if profiler is not None:
+      profiler.start("update.entities")
+    self.animations.tick(self.dt)
+    for view, goal in self.collecting:
+       goal.update(self.dt)
+    # goals whose collected animation ended are removed from the goals drawn
+    if self.collecting:
+      self.remove_ended_goals()
+    if profiler is not None:
+      profiler.stop("update.entities")
+      profiler.start("update.player")
+    self.accumulator += min(self.dt, MAX_FRAME_TIME)
+    while self.accumulator >= self.physics_step:
+      if self.camera is not None:
+        self.follow_player()
+      self.player.update(self.physics_step, self)
+      self.accumulator -= self.physics_step
+    self.alpha = self.accumulator / self.physics_step
+    self.player.draw_rect = self.player.get_draw_rect(self.alpha)
+    if self.camera is not None:
+      self.update_camera()
+    # start building the next view before the player gets there
+    elif self.streaming_window is not None:
+      self.prefetch_nearby()
+    self.player.animate(self.dt)
+    if profiler is not None:
+      profiler.stop("update.player")
+    if self.recorder is not None:
+      self.recorder.track(self)
+    # a checkpoint on entering the next view, never on an end screen
+    if self.checkpoint is not None and self.view > view and not self.player_dead and not self.completed:
+      self.save_checkpoint(self.checkpoint)
 
   """
-    Handles the keypresses made by the used
+    Handles the keypresses made by the used, through the actions they are bound to
+    keys replaces the keys currently pressed on the keyboard when given
   """
-  def events_handler(self):
+  def events_handler(self, keys=None):
+    # a new frame starts with the events
+    if self.profiler is not None:
+      self.profiler.next_frame()
+      self.profiler.start("events")
     # poll for events
     # pygame.QUIT event means the user clicked X to close your window
     for event in pg.event.get():
         if event.type == pg.QUIT:
             self.running = False
-    # key actions, get the current key pressed
-    keys = pg.key.get_pressed()
-    if keys[pg.K_r]: # if key R is pressed, restart
+        # keys going down and up
+        self.actions.handle_event(event)
+        # focus of the window and when it has to be drawn again
+        self.pacer.handle_event(event)
+    # key actions, held, pressed and released on this frame
+    actions = self.actions
+    actions.update(keys)
+    if self.recorder is not None:
+      self.recorder.record(actions, self.dt)
+    if actions.was_pressed("restart"): # if key R is pressed, restart once, not on every frame it is held
        self.restart()
-    if keys[pg.K_a]: # if key a is presed, player moves to left
+    if actions.is_held("left"): # if key a is presed, player moves to left
         self.player.event_direction(Direction.LEFT)
-    if keys[pg.K_d]: # if key d is pressed, player moves to right
+    if actions.is_held("right"): # if key d is pressed, player moves to right
         self.player.event_direction(Direction.RIGHT)
-    if not keys[pg.K_a] and not keys[pg.K_d]: # stop the player if neither keys are pressed
+    if not actions.is_held("left") and not actions.is_held("right"): # stop the player if neither keys are pressed
         self.player.stop()
-    if keys[pg.K_SPACE]: # make the player jump when space is pressed
+    if actions.is_held("jump"): # make the player jump when space is pressed
        self.player.event_jump()
-    if not keys[pg.K_SPACE]: # set jumped to false when space is NOT pressed 
+    if not actions.is_held("jump"): # set jumped to false when space is NOT pressed 
        self.player.set_jumped(False)
+    if self.profiler is not None:
+      self.profiler.stop("events")
+  """
+    Loads the world from its map file (compiled with compile_map.py)
+    Returns the WorldStreamer that builds its views; without a streaming window every view is built now
+  """
+  def load_world(self):
+    # load the tiles of the world, parsed only once for the whole game
+    tile_map = MapLoader.load(self.world)
+    # a single tile grid for the whole world with the scrolling camera, the goals are added as their views are built
+    self.world_collider = None
+    if self.scrolling and self.collision_backend == "grid":
+      self.world_collider = TileCollider(tile_map.concatenated(), 0, [])
+    streamer = WorldStreamer(tile_map.views, partial(self.build_view, tile_map, world_collider=self.world_collider),
+                             self.streaming_window, self.evict_view)
+    if self.scrolling:
+      # the views are chunks of the world, side by side
+      chunk_width = tile_map.cols * 64
+      self.camera = Camera(self.screen.get_size(), chunk_width, tile_map.views)
+      self.chunk_index = ChunkIndex(streamer, chunk_width)
+    streamer.focus(self.view)
+    # the other views are built after the first frame (see finish_loading), or now when loading is not deferred
+    if self.streaming_window is None:
+      if self.defer_loading:
+        self.deferred.append(streamer.build_all)
+      else:
+        streamer.build_all()
+    return streamer
+
+  """
+    Builds a view: its entities, its spatial index (so collisions only look at the entities near
+    the player) and its goals, which are drawn on top of the background.
+    Goals whose center is in collected are already collected. May run on a background thread
+    world_collider is the tile grid of the whole world with the scrolling camera, the goals of the view are added to it
   """
-    Handles the generation of entities for the entire game,
-    Loads from a map file
-    Returns a 2d array that represents the platforms, and goal visible for a specific view
+  def build_view(self, tile_map, view, collected, world_collider=None):
+    entities = self.generate_entities(tile_map, view, collected)
+    all_goals = list(entities.goals.values())
+    goals = [goal for goal in all_goals if not goal.collected]
+    if world_collider is not None:
+      world_collider.add_goals(all_goals)
+      return WorldView(entities, None, goals)
+    if self.collision_backend == "grid":
+      return WorldView(entities, None, goals, TileCollider(tile_map, view, all_goals))
+    # the store is its own spatial index
+    return WorldView(entities, entities, goals)
+
+  """
+    Handles the generation of entities for a view of the game, from the tiles of the world
+    Returns an EntityStore with the platforms and the goal of the view
   """
-  def generate_entities(self):
+  def generate_entities(self, tile_map, view, collected=()):
     # the offset placement of the blocks 
     baseOffset = 32
     # the size of the blocks
     size = 64
-    # open World1.dat
-    with open("Maps/World1.dat") as world_file:
-      entities_per_view = []
-      # read the first line to know how many "views" are in the screen
-      views_count = world_file.readline().replace("\n", "")
-      # loop for view amount of times
-      for view in range(int(views_count)):
-        # create a sprite group for the specific view
-        entities_in_view = pg.sprite.Group()
-        # for each row of the view
-        # NOTE since the blocks are 64 pixels, and the height of the screen is 768, there will be 
-        # 12 blocks per row of the screen. On the other  hand since the screen's width is 1280, 
-        # there can be 20 blocks at most per row of the screen (if we divide each row and col by 64)
-        for row in range(12):
-          # split the line into array so we can easily loop through it
-          cols = [*world_file.readline()]
-          # for each col(index count) and character in cols array
-          for col, entity in enumerate(cols):
-            if entity == "G": # if character is G, it's a goal to collect
-              # get the coordinates
-              x_coor = size * col + baseOffset
-              y_coor = size * row + baseOffset
-              # add the entity into the entities in view
-              entities_in_view.add(Goal(x_coor, y_coor, Goals(view)))
-            # else if entity is not X and not a new line, it must be a platform
-            elif entity != "X" and entity != "\n":
-              # compute the placement of the platform
-              x_coor = size * col + baseOffset
-              y_coor = size * row + baseOffset
-              # add the platform into the entity list for this view
-              entities_in_view.add(Platform(size, size, x_coor, y_coor, Platforms(int(entity))))
-        # add the entities for this view
-        entities_per_view.append(entities_in_view)
-        # read the empty next line 
-        world_file.readline()
-    # return a 2d array that represents the platforms, goal, visible
-    return entities_per_view
-  
+    # with the scrolling camera the entities are placed in the world, after the views on their left
+    origin = view * tile_map.cols * size if self.scrolling else 0
+    # create the store of the entities for the specific view
+    entities_in_view = EntityStore(tile_map.rows, tile_map.cols, size, (origin, 0))
+    # NOTE since the blocks are 64 pixels, and the height of the screen is 768, there will be 
+    # 12 blocks per row of the screen. On the other  hand since the screen's width is 1280, 
+    # there can be 20 blocks at most per row of the screen (if we divide each row and col by 64)
+    for row, col, tile in tile_map.view_tiles(view):
+      # compute the placement of the entity
+      x_coor = size * col + baseOffset + origin
+      y_coor = size * row + baseOffset
+      if tile == MapLoader.TILE_GOAL: # it's a goal to collect
+        # goals types repeat for worlds with more views than types of goals
+        goal = Goal(x_coor, y_coor, Goals(view % len(Goals)), self.animations)
+        # goal collected before the view was removed from memory
+        if (x_coor, y_coor) in collected:
+          goal.collected = True
+          goal.end = True
+        # add the entity into the entities in view
+        entities_in_view.add_goal(row, col, goal)
+      else: # else it must be a platform
+        # add the platform into the entity store for this view
+        entities_in_view.add_platform(row, col, Platforms(tile))
+    # the player collides with the platforms merged into rectangles, the tiles are only drawn
+    entities_in_view.add_colliders(tile_map.view_colliders(view))
+    return entities_in_view
+
+  """
+    Forgets what is kept for a view that is removed from memory
+  """
+  def evict_view(self, view):
+    self.static_layer.remove_view(view)
+    # the world collider forgets the goals of the view, they are added again when it is built again
+    if self.world_collider is not None:
+      cols = self.camera.chunk_width // self.world_collider.tile_size
+      self.world_collider.remove_goals(view * cols, (view + 1) * cols)
+    # the view is built again without the goals being collected
+    self.collecting = [pair for pair in self.collecting if pair[0] != view]
+
+  """
+    Makes the view under the player the current one, used with the scrolling camera.
+    The views the player is near to are built before it collides with them
+  """
+  def follow_player(self):
+    view = self.camera.chunk_at(self.player.rect.centerx)
+    if view != self.view:
+      self.view = view
+      self.streamer.focus(view)
+    for chunk in self.chunk_index.chunks(self.player.rect):
+      self.streamer.get(chunk)
+
+  """
+    Prefetches the view the player is getting close to, when near the edge of the screen
+  """
+  def prefetch_nearby(self):
+    if self.player.rect.right > self.screen.get_width() - PREFETCH_DISTANCE:
+      self.streamer.prefetch(self.view + 1)
+    elif self.player.rect.left < PREFETCH_DISTANCE:
+      self.streamer.prefetch(self.view - 1)
+
   """
     Returns the current entities based on the view
   """
   def get_entities(self):
-     return self.entities_per_view[self.view]
+     return self.streamer.get(self.view).entities
+
+  """
+    Returns the spatial index of the current view, of the views near the player with the scrolling camera
+  """
+  def get_index(self):
+     if self.camera is not None:
+        return self.chunk_index
+     return self.streamer.get(self.view).index
+
+  """
+    Returns the tile grid collider of the current view, None when not using the "grid" collision backend
+  """
+  def get_collider(self):
+     if self.camera is not None:
+        return self.world_collider if self.collision_backend == "grid" else None
+     return self.streamer.get(self.view).collider
   
   """
     Increments the view data member (when the player goes to the right most side of the screen)
@@ -199,42 +534,159 @@ class State():
   def next_view(self):
      if self.view < self.MAX_VIEW:
         self.view += 1
+        self.streamer.focus(self.view)
+        self.refresh_layers()
   """
     Decrements the view data member (when the player goes to the left most side of the screen)
   """
   def prev_view(self):
      if self.view > 0:
         self.view -= 1
+        self.streamer.focus(self.view)
+        self.refresh_layers()
   
   """
     Set the state to completed
   """
   def game_end(self):
      self.completed = True
+     self.hud_changed = True
 
   """
     Set the state to game over
   """
   def game_over(self):
-     self.player_dead = True
+     if not self.player_dead:
+        self.player_dead = True
+        self.hud_changed = True
 
   """
     Restart the state for a new game
+    The world already loaded is put back as it started from the snapshot taken when it was loaded,
+    another world (self.world changed) is loaded from scratch
   """
   def restart(self):
+    if self.start_snapshot.world == self.world:
+      self.restore(self.start_snapshot)
+      return
     self.player = Player()
-    self.entities_per_view = self.generate_entities()
     self.view = 0
-    self.MAX_VIEW = len(self.entities_per_view) - 1
+    # views being built for the previous game are dropped
+    self.streamer.shutdown()
+    self.streamer = self.load_world()
+    self.MAX_VIEW = len(self.streamer) - 1
     self.num_collected = 0
     self.player_dead = False
     self.running = True
     self.completed = False
     self.dt = 0
+    self.accumulator = 0
+    self.alpha = 0
+    self.collecting = []
+    self.animations.reset()
+    self.hud_changed = True
+    self.refresh_layers()
+    if self.renderer is not None:
+      self.renderer.invalidate()
+    self.pacer.invalidate()
+    self.start_snapshot = Snapshot.capture(self)
+
+  """
+    Returns a snapshot of the game, to restore it later or save it as a checkpoint
+  """
+  def snapshot(self):
+    return Snapshot.capture(self)
+
+  """
+    Puts the game back to a snapshot, in place: the player and the views in memory are kept
+    and only their changing fields are set. Goals collecting when the snapshot was taken are restored collected
+  """
+  def restore(self, snapshot):
+    # nothing is changed before the whole snapshot is known to be valid
+    self.check_snapshot(snapshot)
+    player = self.player
+    (position_x, position_y, previous_x, previous_y, velocity_x, velocity_y, rect_x, rect_y, draw_x, draw_y,
+     player.on_floor, player.jumped, player.facing_right, player_state, player.frame_index) = snapshot.player
+    player.position.update(position_x, position_y)
+    player.previous_position.update(previous_x, previous_y)
+    player.velocity.update(velocity_x, velocity_y)
+    player.rect.topleft = (rect_x, rect_y)
+    player.draw_rect.topleft = (draw_x, draw_y)
+    player.state = PlayerState(player_state)
+    player.surf = player.animation_sprites[player.state]["image" if player.facing_right else "flipped"][int(player.frame_index)]
+    view, self.num_collected, self.player_dead, self.completed, self.accumulator, self.alpha, elapsed = snapshot.game
+    self.running = True
+    self.dt = 0
+    self.animations.reset()
+    self.animations.tick(elapsed)
+    # the goals of the views in memory are collected or not as in the snapshot, the others will be built that way
+    self.streamer.restore_collected(snapshot.collected)
+    for resident_view, world_view in self.streamer.resident.items():
+      collected = snapshot.collected.get(resident_view, ())
+      for goal in world_view.entities.goals.values():
+        goal.collected = goal.end = goal.rect.center in collected
+        goal.frame_index = 0
+      # the list is kept by the render pipeline, it is changed in place
+      world_view.goals[:] = [goal for goal in world_view.entities.goals.values() if not goal.collected]
+    self.collecting = []
+    self.view = view
+    self.streamer.focus(view)
+    self.hud_changed = True
+    self.refresh_layers()
+    if self.renderer is not None:
+      self.renderer.invalidate()
+    self.pacer.invalidate()
+
+  """
+    Raises ValueError when a snapshot cannot be restored in this game: another world, or values
+    out of range (e.g. a corrupt checkpoint file)
+  """
+  def check_snapshot(self, snapshot):
+    if snapshot.world != self.world:
+      raise ValueError('the snapshot was taken in ' + snapshot.world + ', not in ' + self.world)
+    (position_x, position_y, previous_x, previous_y, velocity_x, velocity_y, rect_x, rect_y, draw_x, draw_y,
+     on_floor, jumped, facing_right, player_state, frame_index) = snapshot.player
+    view, num_collected, player_dead, completed, accumulator, alpha, elapsed = snapshot.game
+    if not all(math.isfinite(value) for value in (position_x, position_y, previous_x, previous_y, velocity_x,
+                                                  velocity_y, accumulator, alpha, elapsed)):
+      raise ValueError('the snapshot has invalid numbers')
+    if player_state not in {state.value for state in PlayerState}:
+      raise ValueError('the snapshot has an unknown player state')
+    if not 0 <= frame_index < len(self.player.animation_sprites[PlayerState(player_state)]["image"]):
+      raise ValueError('the snapshot has an invalid animation frame')
+    if not 0 <= view <= self.MAX_VIEW or not 0 <= num_collected <= self.MAX_VIEW + 1:
+      raise ValueError('the snapshot has an invalid view or goals collected')
+    if any(not 0 <= collected_view <= self.MAX_VIEW for collected_view in snapshot.collected):
+      raise ValueError('the snapshot has goals collected in views outside the world')
+
+  """
+    Saves the game to a checkpoint file
+  """
+  def save_checkpoint(self, path):
+    self.snapshot().save(path)
+
+  """
+    Continues the game from a checkpoint file
+  """
+  def load_checkpoint(self, path):
+    self.restore(Snapshot.load(path))
+
+  """
+    Removes the goals whose collected animation ended from the goals drawn
+  """
+  def remove_ended_goals(self):
+     for view, goal in [pair for pair in self.collecting if pair[1].end]:
+        self.streamer.get(view).goals.remove(goal)
+        self.collecting.remove((view, goal))
+
   """
     Increment the number of collected goals
   """
   def add_collected(self, goal):
+     # with the scrolling camera the goal can be in the view next to the player's
+     view = self.camera.chunk_at(goal.rect.centerx) if self.camera is not None else self.view
+     self.collecting.append((view, goal))
+     self.streamer.mark_collected(view, goal)
      self.num_collected += 1
      if self.num_collected > self.MAX_VIEW:
         self.game_end()
\ No newline at end of file
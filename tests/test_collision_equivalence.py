@@ -0,0 +1,129 @@
+import os
+import random
+import sys
+import pytest
+
+"""
+  The "grid" collision backend (Components/TileCollider.py) has to behave exactly like the "index"
+  backend: the same input gives the same position and velocity of the player, the same view and
+  the same goals collected, on every tick, with both cameras.
+  tests/data/World1.rec collects a goal and taps R within a single frame (a restart the keys held never show).
+  Maps/World1.map and tests/data/World1.rec (recorded on it with the "index" backend) must be kept in sync:
+  after compiling the world again, record again with python main.py --record tests/data/World1.rec
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RECORDING = os.path.join(ROOT, "tests", "data", "World1.rec")
+sys.path.insert(0, ROOT)
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+
+pytest.importorskip("numpy")
+import pygame as pg
+from state import State
+from Components import InputReplayer, RECORDED_ACTIONS, ScriptedKeys
+
+CAMERAS = ["views", "scroll"]
+SEEDS = [0, 1, 2]
+
+"""
+  Runs the test from the root of the repository, the worlds and assets are relative to it
+"""
+@pytest.fixture(autouse=True)
+def in_root(monkeypatch):
+  monkeypatch.chdir(ROOT)
+
+"""
+  Returns a headless game with the given collision backend and camera, without the asset cache
+"""
+def make_state(backend, camera, world="Maps/World1.map", physics_hz=120):
+  return State(headless=True, world=world, physics_hz=physics_hz, collision_backend=backend,
+               camera=camera, asset_cache=None, defer_loading=False)
+
+"""
+  Returns what has to match on a tick: position and velocity of the player, view and the goals collected
+"""
+def tick_state(state):
+  player = state.player
+  collected = frozenset((view, center) for view, centers in state.streamer.collected.items() for center in centers)
+  return (player.position.x, player.position.y, player.velocity.x, player.velocity.y, state.view,
+          state.num_collected, collected)
+
+"""
+  Returns (keys, dt) of every tick: random keys held for 20 ticks, mostly running right and jumping,
+  with uneven frame times
+"""
+def scripted_trace(seed, ticks=2400):
+  rng = random.Random(seed)
+  trace = []
+  for tick in range(ticks):
+    if tick % 20 == 0:
+      keys = ScriptedKeys([key for key, chance in ((pg.K_a, 0.15), (pg.K_d, 0.8), (pg.K_SPACE, 0.5)) if rng.random() < chance])
+      dt = rng.choice([1 / 60, 1 / 30, 0.0171])
+    trace.append((keys, dt))
+  return trace
+
+"""
+  Plays a trace from the start of the game, returns the state after every tick
+"""
+def run_trace(backend, camera, trace):
+  state = make_state(backend, camera)
+  try:
+    state.restart()
+    ticks = []
+    for keys, dt in trace:
+      state.dt = dt
+      state.events_handler(keys)
+      state.update()
+      ticks.append(tick_state(state))
+    return ticks
+  finally:
+    state.streamer.shutdown()
+
+"""
+  Replays the recording, returns the result of InputReplayer.run and the state after every tick
+"""
+def run_recording(backend, camera):
+  replayer = InputReplayer(RECORDING)
+  state = make_state(backend, camera, replayer.world, replayer.physics_hz)
+  ticks = []
+  update = state.update
+  def update_and_track():
+    update()
+    ticks.append(tick_state(state))
+  state.update = update_and_track
+  try:
+    return replayer.run(state), ticks
+  finally:
+    state.streamer.shutdown()
+
+"""
+  Fails on the first tick where the backends differ
+"""
+def assert_same_ticks(index_ticks, grid_ticks):
+  assert len(index_ticks) == len(grid_ticks)
+  for tick, (index_tick, grid_tick) in enumerate(zip(index_ticks, grid_ticks)):
+    assert index_tick == grid_tick, f"backends differ on tick {tick}"
+
+@pytest.mark.parametrize("camera", CAMERAS)
+@pytest.mark.parametrize("seed", SEEDS)
+def test_scripted_traces_match(camera, seed):
+  trace = scripted_trace(seed)
+  assert_same_ticks(run_trace("index", camera, trace), run_trace("grid", camera, trace))
+
+@pytest.mark.parametrize("camera", CAMERAS)
+def test_recording_matches(camera):
+  index_result, index_ticks = run_recording("index", camera)
+  grid_result, grid_ticks = run_recording("grid", camera)
+  assert index_result["ticks"] > 0
+  assert_same_ticks(index_ticks, grid_ticks)
+  assert index_result["collected"] == grid_result["collected"]
+  assert index_result["digest"] == grid_result["digest"]
+
+def test_recording_replays_as_recorded():
+  result, ticks = run_recording("index", "views")
+  assert result["matches"]
+  # the recording collects goals, so the goal events are compared too
+  assert result["collected"]
+  # and restarts with a tap, pressed without being held
+  restart = 1 << RECORDED_ACTIONS.index("restart")
+  assert any(pressed & restart and not held & restart for held, pressed, dt, ticks in InputReplayer(RECORDING).runs)
@@ -0,0 +1,81 @@
+import os
+import sys
+import pytest
+
+"""
+  A recording has to replay exactly as it was played, including keys going down and up within a
+  single frame (e.g. tapping R on the end screens, which run at IDLE_FPS).
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+
+import pygame as pg
+from state import State
+from Components import InputReplayer, ScriptedKeys
+
+"""
+  Runs the test from the root of the repository, the worlds and assets are relative to it
+"""
+@pytest.fixture(autouse=True)
+def in_root(monkeypatch):
+  monkeypatch.chdir(ROOT)
+
+"""
+  Records ticks of a game: (keys held, taps) of every tick, taps are keys going down and up within the tick.
+  Returns the position of the player after every tick
+"""
+def record(path, trace):
+  state = State(headless=True, asset_cache=None, defer_loading=False)
+  try:
+    state.start_recording(path)
+    positions = []
+    for keys, taps in trace:
+      for key in taps:
+        pg.event.post(pg.event.Event(pg.KEYDOWN, key=key))
+        pg.event.post(pg.event.Event(pg.KEYUP, key=key))
+      state.dt = 1 / 60
+      state.events_handler(keys)
+      state.update()
+      positions.append(tuple(state.player.position))
+    state.recorder.save()
+    return positions
+  finally:
+    state.streamer.shutdown()
+
+"""
+  Replays a recording, returns the result of InputReplayer.run and the position of the player after every tick
+"""
+def replay(path):
+  replayer = InputReplayer(path)
+  state = State(headless=True, world=replayer.world, physics_hz=replayer.physics_hz, asset_cache=None, defer_loading=False)
+  positions = []
+  update = state.update
+  def update_and_track():
+    update()
+    positions.append(tuple(state.player.position))
+  state.update = update_and_track
+  try:
+    return replayer.run(state), positions
+  finally:
+    state.streamer.shutdown()
+
+def test_tap_within_a_frame_is_replayed(tmp_path):
+  path = str(tmp_path / "tap.rec")
+  right = ScriptedKeys([pg.K_d])
+  trace = [(right, ())] * 60 + [(right, (pg.K_r,))] + [(right, ())] * 30
+  recorded = record(path, trace)
+  # the tap restarted the game
+  assert recorded[60][0] < recorded[59][0]
+  result, replayed = replay(path)
+  assert result["matches"]
+  assert replayed == recorded
+
+def test_held_keys_are_replayed(tmp_path):
+  path = str(tmp_path / "held.rec")
+  trace = [(ScriptedKeys([pg.K_d, pg.K_SPACE]), ())] * 40 + [(ScriptedKeys([pg.K_r]), ())] * 5 + [(ScriptedKeys([pg.K_a]), ())] * 40
+  recorded = record(path, trace)
+  result, replayed = replay(path)
+  assert result["matches"]
+  assert replayed == recorded